@@ -0,0 +1,122 @@
+from __future__ import annotations
+from typing import Iterable, Iterator, Sequence, Tuple
+
+class AttributeSet:
+    """
+    A set of columns of a table, stored as a bitmask over the column indices of the table,
+    i.e. bit i is set if the column keys[i] is in the set.
+    e.g. with the keys ("studentNo", "studentName", "GPA"), the set {"studentNo", "GPA"} has the mask 0b101
+
+    Subset, union, intersection and disjointness tests are single integer operations, and a set hashes as its mask.
+    Only sets over the same keys can be combined or compared.
+
+    Attributes:
+        mask (int): The bitmask of the column indices in the set.
+        keys (Tuple[str, ...]): The column names of the table, in column order.
+    """
+    __slots__ = ("mask", "keys")
+
+    def __init__(self, mask: int, keys: Tuple[str, ...]):
+        self.mask = mask
+        self.keys = keys
+
+    @classmethod
+    def from_names(cls, names: Iterable[str], keys: Sequence[str]) -> AttributeSet:
+        """
+        Creates the set of the named columns.
+
+        Args:
+            names (Iterable[str]): The column names in the set.
+            keys (Sequence[str]): The column names of the table, in column order.
+
+        Returns:
+            AttributeSet: The new set.
+
+        Raises:
+            ValueError: If a name is not one of the keys.
+        """
+        keys = tuple(keys)
+        mask = 0
+        for name in names:
+            mask |= 1 << keys.index(name)
+        return cls(mask, keys)
+
+    def indices(self) -> Tuple[int, ...]:
+        """
+        Returns the column indices in the set, in ascending order.
+        """
+        indices = []
+        mask = self.mask
+        while mask:
+            lowest_bit = mask & -mask
+            indices.append(lowest_bit.bit_length() - 1)
+            mask ^= lowest_bit
+        return tuple(indices)
+
+    def names(self) -> Tuple[str, ...]:
+        """
+        Returns the column names in the set, in column order.
+        """
+        return tuple(self.keys[i] for i in self.indices())
+
+    def issubset(self, other: AttributeSet) -> bool:
+        """
+        Checks if every column in this set is also in the other set.
+        """
+        self._check_keys(other)
+        return self.mask & ~other.mask == 0
+
+    def isdisjoint(self, other: AttributeSet) -> bool:
+        """
+        Checks if this set and the other set have no columns in common.
+        """
+        self._check_keys(other)
+        return self.mask & other.mask == 0
+
+    def _check_keys(self, other: AttributeSet) -> None:
+        """
+        Raises a ValueError if the other set is over different keys, as the masks would not be comparable.
+        """
+        if self.keys is not other.keys and self.keys != other.keys:
+            raise ValueError("Error: Cannot combine attribute sets of tables with different keys")
+
+    def __or__(self, other: AttributeSet) -> AttributeSet:
+        self._check_keys(other)
+        return AttributeSet(self.mask | other.mask, self.keys)
+
+    def __and__(self, other: AttributeSet) -> AttributeSet:
+        self._check_keys(other)
+        return AttributeSet(self.mask & other.mask, self.keys)
+
+    def __sub__(self, other: AttributeSet) -> AttributeSet:
+        self._check_keys(other)
+        return AttributeSet(self.mask & ~other.mask, self.keys)
+
+    def __le__(self, other: AttributeSet) -> bool:
+        return self.issubset(other)
+
+    def __lt__(self, other: AttributeSet) -> bool:
+        return self.issubset(other) and self.mask != other.mask
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, AttributeSet):
+            return NotImplemented
+        return self.mask == other.mask and self.keys == other.keys
+
+    def __hash__(self) -> int:
+        return hash(self.mask)
+
+    def __len__(self) -> int:
+        return self.mask.bit_count()
+
+    def __bool__(self) -> bool:
+        return self.mask != 0
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.names())
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.keys and self.mask >> self.keys.index(name) & 1 == 1
+
+    def __repr__(self) -> str:
+        return f"AttributeSet({list(self.names())})"
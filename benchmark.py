@@ -0,0 +1,305 @@
+import argparse
+import json
+import math
+import platform
+import random
+import sys
+import time
+from array import array
+from functools import partial
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from columnstore import ColumnStore, CODE_TYPE
+from table import Table
+import normalforms
+import resultcache
+
+# Benchmarks of the hot paths on synthetic relations with planted dependencies:
+#   - "fd": a composite key (K0, K1) with copies of each key column, surrogate row ids, a partial dependency
+#     K0 -> P and a transitive dependency P -> T, so the 2NF and 3NF searches have something to split
+#   - "mvd": X ->> Y | Z, i.e. every X value has every combination of its Y values and its Z values
+#   - "jd": three columns A, B, C that are the join of random relations over AB, BC and CA, so the join
+#     dependency *(AB, BC, CA) holds without any multivalued dependency
+# Every operation is timed on fresh tables with an empty dependency cache, and the fastest of the repeats is kept.
+# Results are written as JSON and compared against stored thresholds (seconds per benchmark), e.g.
+#   python benchmark.py --profile quick
+#   python benchmark.py --profile quick --update-thresholds
+
+DEFAULT_OUTPUT = "bench_results.json"
+DEFAULT_THRESHOLDS = "benchmark_thresholds.json"
+# Thresholds written by --update-thresholds are the measured times multiplied by this factor
+THRESHOLD_MARGIN = 3.0
+# Thresholds below this many seconds are raised to it, as shorter timings are mostly noise
+MIN_THRESHOLD = 0.05
+
+# Benchmark cases of each profile, as (relation, column count, row count, operations).
+# The normal form stages search every subset of the attributes, so they only run on narrow tables.
+STAGES = ["1NF", "2NF", "3NF", "BCNF", "4NF", "5NF"]
+PROFILES = {
+    "quick": [
+        ("fd", 4, 10, ["keys", "mml"] + STAGES),
+        ("fd", 6, 1000, ["keys", "mml"] + STAGES),
+        ("fd", 8, 10000, ["keys", "mml", "1NF", "2NF", "3NF", "BCNF"]),
+        ("fd", 16, 10000, ["keys", "mml"]),
+        ("fd", 30, 1000, ["keys", "mml"]),
+        ("mvd", 3, 1000, ["keys", "mml"] + STAGES),
+        ("mvd", 4, 10000, ["keys", "mml", "1NF", "2NF", "3NF", "BCNF", "4NF"]),
+        ("jd", 3, 1000, ["keys", "mml", "lossless_5NF"] + STAGES),
+        ("jd", 3, 100000, ["keys", "mml", "lossless_5NF"]),
+    ],
+    "full": [
+        ("fd", 4, 10, ["keys", "mml"] + STAGES),
+        ("fd", 6, 10000, ["keys", "mml"] + STAGES),
+        ("fd", 8, 100000, ["keys", "mml", "1NF", "2NF", "3NF", "BCNF"]),
+        ("fd", 12, 100000, ["keys", "mml"]),
+        ("fd", 20, 1000000, ["keys", "mml"]),
+        ("fd", 30, 1000000, ["keys", "mml"]),
+        ("fd", 4, 10000000, ["keys", "mml"]),
+        ("mvd", 4, 100000, ["keys", "mml"] + STAGES),
+        ("mvd", 3, 10000000, ["keys", "mml"]),
+        ("jd", 3, 100000, ["keys", "mml", "lossless_5NF"] + STAGES),
+        ("jd", 3, 1000000, ["keys", "mml", "lossless_5NF"]),
+    ],
+}
+
+def fd_relation(column_count: int, row_count: int, seed: int = 0) -> Table:
+    """
+    Generates a relation with the composite key (K0, K1) and planted functional dependencies.
+    Besides K0 and K1 there is a partial dependency K0 -> P and a transitive dependency P -> T.
+    The remaining columns cycle through copies of K0 and K1 (permutations of their values, i.e. further keys)
+    and surrogate row ids (permutations of the row numbers, i.e. single-column keys).
+
+    Args:
+        column_count (int): The number of columns, at least 4.
+        row_count (int): The number of rows.
+        seed (int): The seed of the random permutations.
+
+    Returns:
+        Table: The generated relation, with no primary keys marked.
+
+    Raises:
+        ValueError: If there are fewer than 4 columns.
+    """
+    if column_count < 4:
+        raise ValueError("Error: A functional dependency relation needs at least 4 columns")
+    rng = random.Random(seed)
+    # Every (K0, K1) pair appears at most once, so the rows are unique
+    k1_count = max(1, math.isqrt(row_count - 1) + 1)
+    k0 = array(CODE_TYPE, (i // k1_count for i in range(row_count)))
+    k1 = array(CODE_TYPE, (i % k1_count for i in range(row_count)))
+    k0_count = max(k0) + 1 if row_count else 1
+    p_count = max(1, k0_count // 3)
+    p_of_k0 = [rng.randrange(p_count) for _ in range(k0_count)]
+    t_of_p = [rng.randrange(max(1, p_count // 3)) for _ in range(p_count)]
+    p = array(CODE_TYPE, map(p_of_k0.__getitem__, k0))
+    t = array(CODE_TYPE, map(t_of_p.__getitem__, p))
+    header = ["K0", "K1", "P", "T"]
+    codes = [k0, k1, p, t]
+    sizes = [k0_count, k1_count, p_count, p_count]
+    for extra in range(column_count - 4):
+        kind = extra % 3
+        if kind == 2:
+            permutation = rng.sample(range(row_count), row_count)
+            header.append(f"ID{extra // 3}")
+            codes.append(array(CODE_TYPE, permutation))
+            sizes.append(max(row_count, 1))
+        else:
+            source, size = (k0, k0_count) if kind == 0 else (k1, k1_count)
+            permutation = rng.sample(range(size), size)
+            header.append(f"K{kind}_{extra // 3}")
+            codes.append(array(CODE_TYPE, map(permutation.__getitem__, source)))
+            sizes.append(size)
+    return _table_from_codes(header, codes, sizes, row_count)
+
+def mvd_relation(column_count: int, row_count: int, seed: int = 0) -> Table:
+    """
+    Generates a relation with the planted multivalued dependency X ->> Y | Z: every X value has a set of
+    Y values and a set of Z values, and a row for every combination of the two. With 4 columns,
+    the extra column W depends on X.
+
+    Args:
+        column_count (int): The number of columns, 3 or 4.
+        row_count (int): The approximate number of rows.
+        seed (int): The seed of the random sets.
+
+    Returns:
+        Table: The generated relation, with no primary keys marked.
+
+    Raises:
+        ValueError: If there are not 3 or 4 columns.
+    """
+    if column_count not in (3, 4):
+        raise ValueError("Error: A multivalued dependency relation has 3 or 4 columns")
+    rng = random.Random(seed)
+    # Each X value has between 1 and 2 * per_set Y values and Z values
+    per_set = max(1, round(row_count ** (1 / 3) / 2))
+    value_count = 4 * per_set
+    columns = [array(CODE_TYPE) for _ in range(column_count)]
+    x = 0
+    while len(columns[0]) < row_count:
+        y_values = rng.sample(range(value_count), rng.randint(1, 2 * per_set))
+        z_values = rng.sample(range(value_count), rng.randint(1, 2 * per_set))
+        w = rng.randrange(value_count)
+        for y in y_values:
+            for z in z_values:
+                columns[0].append(x)
+                columns[1].append(y)
+                columns[2].append(z)
+                if column_count == 4:
+                    columns[3].append(w)
+        x += 1
+    header = ["X", "Y", "Z", "W"][:column_count]
+    sizes = [x, value_count, value_count, value_count][:column_count]
+    return _table_from_codes(header, columns, sizes, len(columns[0]))
+
+def jd_relation(column_count: int, row_count: int, seed: int = 0) -> Table:
+    """
+    Generates a relation over A, B and C that is the join of random relations over AB, BC and CA,
+    so it always decomposes losslessly into its three projections (see normalforms.is_lossless_5NF).
+
+    Args:
+        column_count (int): The number of columns, which must be 3.
+        row_count (int): The approximate number of rows.
+        seed (int): The seed of the random relations.
+
+    Returns:
+        Table: The generated relation, with no primary keys marked.
+
+    Raises:
+        ValueError: If there are not 3 columns.
+    """
+    if column_count != 3:
+        raise ValueError("Error: A join dependency relation has 3 columns")
+    rng = random.Random(seed)
+    # Each pair is in a binary relation with probability 1/2, so the join has about (size / 2) ** 3 rows
+    size = max(2, round(2 * row_count ** (1 / 3)))
+    ab = [[b for b in range(size) if rng.random() < 0.5] for _ in range(size)]
+    bc = [[c for c in range(size) if rng.random() < 0.5] for _ in range(size)]
+    ca = [{a for a in range(size) if rng.random() < 0.5} for _ in range(size)]
+    columns = [array(CODE_TYPE) for _ in range(3)]
+    for a in range(size):
+        for b in ab[a]:
+            for c in bc[b]:
+                if a in ca[c]:
+                    columns[0].append(a)
+                    columns[1].append(b)
+                    columns[2].append(c)
+    return _table_from_codes(["A", "B", "C"], columns, [size] * 3, len(columns[0]))
+
+RELATIONS = {"fd": fd_relation, "mvd": mvd_relation, "jd": jd_relation}
+
+def _table_from_codes(header: List[str], codes: List[array], sizes: List[int], row_count: int) -> Table:
+    """
+    Creates a columnar table whose values are the codes themselves, without encoding any rows.
+    """
+    store = ColumnStore(codes, [list(range(size)) for size in sizes], row_count)
+    return Table.from_column_store(header, store, columnar=True, rows_are_unique=True)
+
+def time_operation(operation: str, make_table: Callable[[], Table]) -> float:
+    """
+    Times a single benchmark operation on a freshly generated table, with an empty dependency cache.
+    The normal form stages are run on the tables of the previous stages, which are created untimed.
+
+    Args:
+        operation (str): "keys", "mml", "lossless_5NF" or the name of a normal form stage (e.g. "BCNF").
+        make_table (Callable[[], Table]): Generates the relation.
+
+    Returns:
+        float: The wall time of the operation in seconds.
+    """
+    table = make_table()
+    resultcache.clear()
+    if operation == "keys":
+        start = time.perf_counter()
+        table.calculate_candidate_keys()
+    elif operation == "mml":
+        # MML needs the primary keys of the table, so the table is scored with its best primary keys
+        table = normalforms.best_1NF_table(table)
+        start = time.perf_counter()
+        normalforms.calculate_mml([table])
+    elif operation == "lossless_5NF":
+        child_tables = normalforms.split_table_5NF(table)
+        start = time.perf_counter()
+        normalforms.is_lossless_5NF(table, child_tables)
+    else:
+        builders = dict(normalforms.NORMAL_FORM_BUILDERS)
+        tables = [table]
+        for name in STAGES[:STAGES.index(operation)]:
+            tables = builders[name](tables)
+        start = time.perf_counter()
+        builders[operation](tables)
+    return time.perf_counter() - start
+
+def run_benchmarks(profile: str, repeat: int = 3, seed: int = 0, \
+    progress: Optional[Callable[[str, float], None]] = None) -> Dict[str, Any]:
+    """
+    Runs every benchmark case of a profile.
+
+    Args:
+        profile (str): The name of the profile (see PROFILES).
+        repeat (int): The number of times each operation is timed. The fastest time is kept.
+        seed (int): The seed of the generated relations.
+        progress (Optional[Callable[[str, float], None]]): Called with the name and time of each benchmark.
+
+    Returns:
+        Dict[str, Any]: The results, with the time in seconds of each benchmark by name
+        (e.g. "fd-8x10000/BCNF") under "results".
+
+    Raises:
+        ValueError: If the profile does not exist.
+    """
+    if profile not in PROFILES:
+        raise ValueError(f"Error: Unknown profile {profile}, expected one of {list(PROFILES)}")
+    results = {}
+    for relation, column_count, row_count, operations in PROFILES[profile]:
+        make_table = partial(RELATIONS[relation], column_count, row_count, seed)
+        for operation in operations:
+            name = f"{relation}-{column_count}x{row_count}/{operation}"
+            results[name] = min(time_operation(operation, make_table) for _ in range(repeat))
+            if progress is not None:
+                progress(name, results[name])
+    return {"profile": profile, "repeat": repeat, "seed": seed, "python": platform.python_version(), \
+        "results": results}
+
+def compare_with_thresholds(results: Dict[str, float], thresholds: Dict[str, float]) -> List[Tuple[str, float, float]]:
+    """
+    Returns the benchmarks that took longer than their threshold, as (name, seconds, threshold) tuples.
+    Benchmarks without a threshold are not checked.
+    """
+    return [(name, seconds, thresholds[name]) for name, seconds in results.items() \
+        if name in thresholds and seconds > thresholds[name]]
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmarks the normalisation hot paths on synthetic relations.")
+    parser.add_argument("--profile", choices=list(PROFILES), default="quick")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="JSON file the results are written to")
+    parser.add_argument("--thresholds", default=DEFAULT_THRESHOLDS, help="JSON file of thresholds in seconds")
+    parser.add_argument("--update-thresholds", action="store_true", \
+        help=f"Store the measured times (times {THRESHOLD_MARGIN}) as the thresholds of this profile")
+    args = parser.parse_args(argv)
+
+    report = run_benchmarks(args.profile, args.repeat, args.seed, \
+        progress=lambda name, seconds: print(f"{name:40} {seconds:10.4f}s"))
+    with open(args.output, "w") as file:
+        json.dump(report, file, indent=2)
+
+    try:
+        with open(args.thresholds) as file:
+            thresholds = json.load(file)
+    except FileNotFoundError:
+        thresholds = {}
+    if args.update_thresholds:
+        thresholds[args.profile] = {name: round(max(seconds * THRESHOLD_MARGIN, MIN_THRESHOLD), 4) \
+            for name, seconds in report["results"].items()}
+        with open(args.thresholds, "w") as file:
+            json.dump(thresholds, file, indent=2)
+        print(f"Updated the {args.profile} thresholds in {args.thresholds}")
+        return 0
+    regressions = compare_with_thresholds(report["results"], thresholds.get(args.profile, {}))
+    for name, seconds, threshold in regressions:
+        print(f"REGRESSION {name}: {seconds:.4f}s > {threshold:.4f}s")
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,177 @@
+from typing import Dict, List, Optional, Sequence, Tuple
+
+class DependencyCatalogue:
+    """
+    A catalogue of the functional dependencies and candidate keys found in a table, shared by every table
+    projected from it (see Table.project), so the tables of all normal form stages consult the same results.
+    Attribute sets are stored as bitmasks over the columns of the original table, by column name.
+
+    Projection rules, which hold because a projection only removes columns and duplicate rows:
+    - A functional dependency X -> Y holds in a projection (containing X and Y) exactly when it holds in the original table,
+      so a dependency found in any of the tables is known for all of them.
+    - X is unique in a projection P exactly when X -> A holds for every other column A of P.
+    Functional dependencies are stored with a single dependent column, as X -> Y holds exactly when X -> A holds
+    for every column A in Y. For each dependent column, the minimal determinants known to hold and the maximal
+    determinants known not to hold are kept, so that
+    - X -> A holds if some Z -> A holds with Z a subset of X, and
+    - X -> A does not hold if some Z -> A does not hold with X a subset of Z.
+    Multivalued dependency candidates (see normalforms.possible_multivalued_dependency) are made of
+    functional dependency checks, so they are answered from the catalogue as well.
+
+    Attributes:
+        keys (Tuple[str, ...]): The column names of the original table.
+        candidate_keys (Dict[Tuple[str, ...], List[Tuple[int, ...]]]): The candidate keys (as column indices)
+            of each set of columns, by the column names in order.
+        hits (int): The number of dependency lookups answered by the catalogue.
+        misses (int): The number of dependency lookups that had to be checked against the rows.
+    """
+
+    def __init__(self, keys: Sequence[str]):
+        self.keys = tuple(keys)
+        self._bits = {key: 1 << i for i, key in enumerate(self.keys)}
+        # Known results, by (determinant mask, dependent column bit)
+        self._results = {}
+        # Minimal determinants that hold and maximal determinants that do not hold, by dependent column bit
+        self._minimal_determinants = {}
+        self._maximal_non_determinants = {}
+        self.candidate_keys = {}
+        self.hits = 0
+        self.misses = 0
+
+    def attribute_mask(self, names: Sequence[str]) -> int:
+        """
+        Returns the bitmask of a set of columns of the original table.
+
+        Args:
+            names (Sequence[str]): The column names.
+
+        Returns:
+            int: The bitmask of the columns.
+        """
+        mask = 0
+        for name in names:
+            mask |= self._bits[name]
+        return mask
+
+    def lookup(self, determinant: int, dependent_bit: int) -> Optional[bool]:
+        """
+        Looks up whether the functional dependency determinant -> dependent column holds, using the projection rules.
+
+        Args:
+            determinant (int): The bitmask of the determinant columns.
+            dependent_bit (int): The bit of the dependent column.
+
+        Returns:
+            Optional[bool]: True or False if the result is known, None if it has to be checked against the rows.
+        """
+        result = self._results.get((determinant, dependent_bit))
+        if result is None:
+            result = self._infer(determinant, dependent_bit)
+        if result is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return result
+
+    def _infer(self, determinant: int, dependent_bit: int) -> Optional[bool]:
+        """
+        Infers whether determinant -> dependent column holds from the results already known.
+        """
+        if determinant & dependent_bit:
+            return True
+        for known_determinant in self._minimal_determinants.get(dependent_bit, ()):
+            if known_determinant & ~determinant == 0:
+                return True
+        for known_determinant in self._maximal_non_determinants.get(dependent_bit, ()):
+            if determinant & ~known_determinant == 0:
+                return False
+        return None
+
+    def determines(self, determinant: int, dependent: int) -> Optional[bool]:
+        """
+        Looks up whether the functional dependency determinant -> dependent holds, for any number of dependent columns.
+
+        Args:
+            determinant (int): The bitmask of the determinant columns.
+            dependent (int): The bitmask of the dependent columns.
+
+        Returns:
+            Optional[bool]: True if it is known to hold for every dependent column, False if it is known not to hold
+            for one of them, and None otherwise.
+        """
+        result = True
+        remaining = dependent & ~determinant
+        while remaining:
+            dependent_bit = remaining & -remaining
+            remaining ^= dependent_bit
+            known = self._results.get((determinant, dependent_bit))
+            if known is None:
+                known = self._infer(determinant, dependent_bit)
+            if known is False:
+                return False
+            if known is None:
+                result = None
+        return result
+
+    def record(self, determinant: int, dependent_bit: int, holds: bool) -> None:
+        """
+        Records whether the functional dependency determinant -> dependent column holds.
+
+        Args:
+            determinant (int): The bitmask of the determinant columns.
+            dependent_bit (int): The bit of the dependent column.
+            holds (bool): True if the functional dependency holds, False otherwise.
+
+        Returns:
+            None
+        """
+        self._results[(determinant, dependent_bit)] = holds
+        if holds:
+            known = self._minimal_determinants.get(dependent_bit, [])
+            if any(d & ~determinant == 0 for d in known):
+                return
+            # Supersets of the determinant are implied by it, so they are no longer minimal
+            self._minimal_determinants[dependent_bit] = [d for d in known if determinant & ~d != 0] + [determinant]
+        else:
+            known = self._maximal_non_determinants.get(dependent_bit, [])
+            if any(determinant & ~d == 0 for d in known):
+                return
+            # Subsets of the determinant are implied by it, so they are no longer maximal
+            self._maximal_non_determinants[dependent_bit] = [d for d in known if d & ~determinant != 0] + [determinant]
+
+    def record_key(self, key: int, columns: int) -> None:
+        """
+        Records that a set of columns is unique in a table, i.e. that it determines every other column of the table.
+
+        Args:
+            key (int): The bitmask of the unique columns.
+            columns (int): The bitmask of all columns of the table.
+
+        Returns:
+            None
+        """
+        remaining = columns & ~key
+        while remaining:
+            dependent_bit = remaining & -remaining
+            remaining ^= dependent_bit
+            if (key, dependent_bit) not in self._results:
+                self.record(key, dependent_bit, True)
+
+    def minimal_dependencies(self) -> List[Tuple[Tuple[str, ...], str]]:
+        """
+        Returns the minimal functional dependencies found so far, as (determinant columns, dependent column) pairs.
+        Every other functional dependency known to hold follows from these.
+        """
+        dependencies = []
+        for dependent_bit, determinants in self._minimal_determinants.items():
+            dependent = self.keys[dependent_bit.bit_length() - 1]
+            for determinant in determinants:
+                dependencies.append((tuple(key for key in self.keys if self._bits[key] & determinant), dependent))
+        return dependencies
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Returns the hit/miss statistics and size of the catalogue.
+        """
+        return {"hits": self.hits, "misses": self.misses, "dependencies": len(self._results), \
+            "candidate_key_sets": len(self.candidate_keys)}
@@ -1,4 +1,5 @@
 import math
+from functools import lru_cache
 
 def ptmultiplier(a, p, v=4):
     """
@@ -24,6 +25,38 @@ def ptmultiplier(a, p, v=4):
     else:
         raise ValueError("Error: Invalid p value")
 
+@lru_cache(maxsize=None)
+def log2(n: int) -> float:
+    """
+    Cached math.log2, as the same attribute counts and unique counts are used again and again.
+
+    Args:
+        n (int): A positive integer.
+
+    Returns:
+        float: The base 2 logarithm of n.
+
+    """
+    return math.log2(n)
+
+@lru_cache(maxsize=None)
+def table_H(a: int, at: int, pt: int) -> float:
+    """
+    Calculates the part of #H for a single table, which only depends on three counts,
+    so it is cached rather than calculating the binomial coefficients again for every decomposition.
+
+    Args:
+        a (int): The number of attributes.
+        at (int): The number of attributes in the table.
+        pt (int): The number of primary keys in the table.
+
+    Returns:
+        float: The length of the table's header in #H.
+
+    """
+    # Primary key probability weighting applied
+    return (log2(math.comb(a, at)) + log2(at) + log2(math.comb(at, pt))) + -math.log2(ptmultiplier(at, pt))
+
 def H(tabletotal: int, a: int, atpttuples: list[tuple[int, int]]) -> float:
     """
     Function to calculate #H.
@@ -40,11 +73,10 @@ def H(tabletotal: int, a: int, atpttuples: list[tuple[int, int]]) -> float:
 
     """
     # Tabletotal is added to total as representation for unary coding
-    total = len(atpttuples) * math.log2(a) + tabletotal
+    total = len(atpttuples) * log2(a) + tabletotal
     for atpttuple in atpttuples:
         at, pt = atpttuple[0], atpttuple[1]
-        # Primary key probability weighting applied
-        total += (math.log2(math.comb(a, at)) + math.log2(at) + math.log2(math.comb(at, pt))) + -math.log2(ptmultiplier(at, pt))
+        total += table_H(a, at, pt)
     # return round(total, 2)
     return total
 
@@ -63,9 +95,24 @@ def A(data: list[tuple[int, list]]) -> float:
     """
     total = float(0)
     for column in data:
-        total += (column[0] * sum(map(lambda x: math.log2(x), column[1])))
+        total += table_A(column[0], column[1])
     return total
 
+def table_A(rows: int, unique_counts: list[int]) -> float:
+    """
+    Calculates the part of #A for a single table.
+    e.g. table_A(11, [5, 5, 5, 5, 4, 4, 2, 2, 3, 3]) is A([(11, [5, 5, 5, 5, 4, 4, 2, 2, 3, 3])])
+
+    Args:
+        rows (int): The number of rows in the table.
+        unique_counts (list[int]): The number of unique values in each column of the table.
+
+    Returns:
+        float: The length of the table's data in #A.
+
+    """
+    return rows * sum(map(log2, unique_counts))
+
 def I(tabletotal: int, a: int, atpttuples: list[tuple[int, int]], data: list[tuple[int, list]]) -> float:
     """
     Function to calculate #I.
@@ -85,6 +132,47 @@ def I(tabletotal: int, a: int, atpttuples: list[tuple[int, int]], data: list[tup
     """
     return round(H(tabletotal, a, atpttuples) + A(data), 2)
 
+def I_batch(decompositions: list[tuple[int, list[tuple[int, int, int, list[int]]]]]) -> list[float]:
+    """
+    Function to calculate #I for many decompositions at once, using the cached log2 and #H terms.
+    Each decomposition is given as the number of attributes a and one (at, pt, rows, unique_counts) tuple per table.
+    e.g. the 2NF example of I() is the decomposition
+    (10, [(6, 1, 5, [5, 5, 5, 5, 2, 2]), (2, 1, 4, [4, 4]), (4, 3, 11, [5, 4, 3, 3])])
+    Gives exactly the same values as calling I() for each decomposition.
+
+    Args:
+        decompositions (list[tuple[int, list[tuple[int, int, int, list[int]]]]]): The decompositions to score. See example above.
+
+    Returns:
+        list[float]: The value of #I for each decomposition, in the same order.
+
+    """
+    return [I_from_lengths(a, [(at, pt, table_A(rows, unique_counts)) for at, pt, rows, unique_counts in tables]) \
+        for a, tables in decompositions]
+
+def I_from_lengths(a: int, tables: list[tuple[int, int, float]]) -> float:
+    """
+    Function to calculate #I for one decomposition from the #A length of each table (see table_A),
+    so that a table's data length can be calculated once and reused in every decomposition it is part of.
+    e.g. the 1NF example of I() is I_from_lengths(10, [(10, 3, table_A(11, [5, 5, 5, 5, 4, 4, 2, 2, 3, 3]))])
+    Gives exactly the same value as I().
+
+    Args:
+        a (int): The total number of attributes across all tables.
+        tables (list[tuple[int, int, float]]): The attribute count, primary key count and #A length of each table.
+
+    Returns:
+        float: The value of #I.
+
+    """
+    # Tabletotal is added as representation for unary coding, as in H()
+    header_total = len(tables) * log2(a) + len(tables)
+    data_total = float(0)
+    for at, pt, data_length in tables:
+        header_total += table_H(a, at, pt)
+        data_total += data_length
+    return round(header_total + data_total, 2)
+
 def convert_to_LaTeX(nfs: list[str], values: list[list[float]]) -> str:
     """
     Converts the given list of normalized forms (nfs) and their corresponding values
@@ -0,0 +1,294 @@
+from __future__ import annotations
+import mmap
+from array import array
+from itertools import compress, repeat
+from operator import add, mul
+from typing import List, Tuple, Any, Optional, Sequence, Iterable, Iterator
+
+# Type code used for the integer code arrays (4 byte signed integers)
+CODE_TYPE = 'i'
+
+class ColumnStore:
+    """
+    Stores the rows of a table column by column, with every column dictionary-encoded.
+    Each column is an array of integer codes, and each code indexes into the value dictionary of its column.
+    e.g. the column ["a", "b", "a", "c"] is stored as the codes [0, 1, 0, 2] and the dictionary ["a", "b", "c"]
+
+    Code arrays and dictionaries are shared between stores (e.g. by project), and the methods of a store never
+    modify them. A table may only change them in place while no other store shares them, which it tracks with
+    Table._owns_store, copying them first otherwise (see Table.insert_rows and Table.delete_rows).
+
+    Attributes:
+        codes (List[Sequence[int]]): The integer code array of each column.
+        dictionaries (List[List[Any]]): The value dictionary of each column.
+        row_count (int): The number of rows in the store.
+        mapped_file (Optional[mmap.mmap]): The memory-mapped file the code arrays are views of, if any (see tablefile.py).
+    """
+
+    def __init__(self, codes: List[Sequence[int]], dictionaries: List[List[Any]], row_count: int, \
+        mapped_file: Optional[mmap.mmap] = None):
+        self.codes = codes
+        self.dictionaries = dictionaries
+        self.row_count = row_count
+        self.mapped_file = mapped_file
+
+    @classmethod
+    def from_rows(cls, rows: Sequence[Sequence[Any]], column_count: int) -> ColumnStore:
+        """
+        Dictionary-encodes rows of values into a new ColumnStore, one column at a time.
+        To encode rows as they are read, use ColumnEncoder instead.
+
+        Args:
+            rows (Sequence[Sequence[Any]]): The rows to encode.
+            column_count (int): The number of columns in each row.
+
+        Returns:
+            ColumnStore: The encoded rows.
+        """
+        codes = []
+        dictionaries = []
+        for col_index in range(column_count):
+            # Maps each value to its code, which is the number of values seen before it
+            lookup = {}
+            codes.append(array(CODE_TYPE, [lookup.setdefault(row[col_index], len(lookup)) for row in rows]))
+            dictionaries.append(list(lookup))
+        return cls(codes, dictionaries, len(rows))
+
+    def __getstate__(self) -> dict:
+        # Code arrays may be views of a memory-mapped file (see tablefile.py), which cannot be pickled
+        state = self.__dict__.copy()
+        state["codes"] = [codes if isinstance(codes, array) else array(CODE_TYPE, codes) for codes in self.codes]
+        state["mapped_file"] = None
+        return state
+
+    def close(self) -> None:
+        """
+        Releases the memory-mapped file the code arrays are views of, so the file can be modified or removed.
+        The store, and any store sharing its code arrays (e.g. a projection), cannot be used afterwards.
+        Does nothing if the store was not opened from a file.
+
+        Raises:
+            BufferError: If another view of the mapped file is still in use.
+        """
+        if self.mapped_file is None:
+            return
+        for codes in self.codes:
+            if isinstance(codes, memoryview):
+                codes.release()
+        self.mapped_file.close()
+        self.mapped_file = None
+
+    @property
+    def column_count(self) -> int:
+        return len(self.codes)
+
+    def column(self, col_index: int) -> List[Any]:
+        """
+        Decodes a single column.
+
+        Args:
+            col_index (int): The index of the column.
+
+        Returns:
+            List[Any]: The values of the column, one per row.
+        """
+        dictionary = self.dictionaries[col_index]
+        return [dictionary[code] for code in self.codes[col_index]]
+
+    def row(self, row_index: int) -> List[Any]:
+        """
+        Decodes a single row.
+
+        Args:
+            row_index (int): The index of the row.
+
+        Returns:
+            List[Any]: The values of the row, one per column.
+        """
+        return [self.dictionaries[i][self.codes[i][row_index]] for i in range(len(self.codes))]
+
+    def to_rows(self) -> List[List[Any]]:
+        """
+        Decodes the whole store back into a list of rows.
+
+        Returns:
+            List[List[Any]]: The rows of the store.
+        """
+        if not self.codes:
+            return [[] for _ in range(self.row_count)]
+        return [list(row) for row in zip(*[self.column(i) for i in range(len(self.codes))])]
+
+    def code_rows(self) -> Iterable[Tuple[int, ...]]:
+        """
+        Returns an iterator over the rows of the store as tuples of codes.
+        """
+        if not self.codes:
+            return iter([() for _ in range(self.row_count)])
+        return zip(*self.codes)
+
+    def combination_keys(self, col_indices: Sequence[int]) -> Iterator[int]:
+        """
+        Returns a lazy iterator over the rows of the store, giving one integer per row that identifies the
+        codes of the row in the given columns. Two rows get the same integer exactly when they have the same
+        values in all of the columns, so rows can be compared without building a tuple for each row.
+        e.g. for columns with dictionaries of sizes 3 and 4, the codes (2, 1) give the key 2 * 4 + 1 = 9
+        The keys are calculated as the rows are consumed, so stopping early skips the remaining rows.
+
+        Args:
+            col_indices (Sequence[int]): The indices of the columns.
+
+        Returns:
+            Iterator[int]: The key of each row, in row order.
+        """
+        if not col_indices:
+            return repeat(0, self.row_count)
+        keys = iter(self.codes[col_indices[0]])
+        for i in col_indices[1:]:
+            # Mixed-radix number with one digit per column, as every code is less than its dictionary size
+            keys = map(add, map(mul, keys, repeat(len(self.dictionaries[i]))), self.codes[i])
+        return keys
+
+    def unique_count(self, col_index: int) -> int:
+        """
+        Counts the number of unique values in a column.
+        Dictionaries may hold values that no longer appear (e.g. after rows have been removed),
+        so the codes themselves are counted.
+
+        Args:
+            col_index (int): The index of the column.
+
+        Returns:
+            int: The number of unique values in the column.
+        """
+        return len(set(self.codes[col_index]))
+
+    def project(self, col_indices: Sequence[int]) -> ColumnStore:
+        """
+        Returns a store with only the given columns. The code arrays and dictionaries are shared, not copied.
+        Note: The projected rows may contain duplicates.
+
+        Args:
+            col_indices (Sequence[int]): The indices of the columns to keep, in their new order.
+
+        Returns:
+            ColumnStore: The projected store.
+        """
+        return ColumnStore([self.codes[i] for i in col_indices], [self.dictionaries[i] for i in col_indices], self.row_count)
+
+    def take(self, row_indices: Sequence[int]) -> ColumnStore:
+        """
+        Returns a store with only the given rows. The dictionaries are shared, not copied.
+
+        Args:
+            row_indices (Sequence[int]): The indices of the rows to keep, in their new order.
+
+        Returns:
+            ColumnStore: The store with the selected rows.
+        """
+        codes = [array(CODE_TYPE, map(column.__getitem__, row_indices)) for column in self.codes]
+        return ColumnStore(codes, self.dictionaries, len(row_indices))
+
+    def delete(self, row_indices: Iterable[int]) -> ColumnStore:
+        """
+        Returns a store without the given rows, keeping the other rows in order. The dictionaries are shared, not copied.
+
+        Args:
+            row_indices (Iterable[int]): The indices of the rows to remove.
+
+        Returns:
+            ColumnStore: The store without the removed rows.
+        """
+        keep = bytearray(b"\x01") * self.row_count
+        for i in row_indices:
+            keep[i] = 0
+        codes = [array(CODE_TYPE, compress(column, keep)) for column in self.codes]
+        return ColumnStore(codes, self.dictionaries, sum(keep))
+
+    def nbytes(self) -> int:
+        """
+        Returns the number of bytes used by the code arrays.
+        """
+        return sum(len(column) * array(CODE_TYPE).itemsize for column in self.codes)
+
+
+class ColumnEncoder:
+    """
+    Dictionary-encodes rows one at a time, so a ColumnStore can be built without holding all rows as lists.
+
+    Attributes:
+        codes (List[array]): The integer code array of each column.
+        dictionaries (List[List[Any]]): The value dictionary of each column.
+        row_count (int): The number of rows appended so far.
+    """
+
+    def __init__(self, column_count: int):
+        self.codes = [array(CODE_TYPE) for _ in range(column_count)]
+        self.dictionaries = [[] for _ in range(column_count)]
+        # Maps each value to its code, per column
+        self._lookups = [{} for _ in range(column_count)]
+        self.row_count = 0
+
+    def encode(self, row: Sequence[Any]) -> Tuple[int, ...]:
+        """
+        Returns the codes of the values in a row, adding any new values to the dictionaries.
+
+        Args:
+            row (Sequence[Any]): The row to encode.
+
+        Returns:
+            Tuple[int, ...]: The code of each value in the row.
+        """
+        codes = []
+        for col_index, value in enumerate(row):
+            lookup = self._lookups[col_index]
+            code = lookup.get(value)
+            if code is None:
+                code = len(lookup)
+                lookup[value] = code
+                self.dictionaries[col_index].append(value)
+            codes.append(code)
+        return tuple(codes)
+
+    def row_codes(self, row_index: int) -> Tuple[int, ...]:
+        """
+        Returns the codes of a row that has already been appended.
+
+        Args:
+            row_index (int): The index of the row.
+
+        Returns:
+            Tuple[int, ...]: The code of each value in the row.
+        """
+        return tuple(column[row_index] for column in self.codes)
+
+    def append_codes(self, codes: Sequence[int]) -> None:
+        """
+        Appends a row that has already been encoded with encode().
+
+        Args:
+            codes (Sequence[int]): The code of each value in the row.
+
+        Returns:
+            None
+        """
+        for col_index, code in enumerate(codes):
+            self.codes[col_index].append(code)
+        self.row_count += 1
+
+    def append(self, row: Sequence[Any]) -> None:
+        """
+        Encodes and appends a row.
+
+        Args:
+            row (Sequence[Any]): The row to append.
+
+        Returns:
+            None
+        """
+        self.append_codes(self.encode(row))
+
+    def to_store(self) -> ColumnStore:
+        """
+        Returns a ColumnStore holding all rows appended so far.
+        """
+        return ColumnStore(self.codes, self.dictionaries, self.row_count)
@@ -0,0 +1,78 @@
+import csv
+from itertools import islice
+from typing import Optional
+from columnstore import ColumnEncoder
+from table import Table
+
+# Number of rows read from the file at a time
+DEFAULT_CHUNK_SIZE = 10000
+
+def load_delimited(path: str, delimiter: Optional[str] = None, chunk_size: int = DEFAULT_CHUNK_SIZE, \
+    encoding: str = "utf-8", columnar: bool = True) -> Table:
+    """
+    Streams a CSV/TSV file into a Table, without first reading it into a list of lists.
+    The first row of the file is the header, where primary keys can be marked with an asterisk (*)
+    as in the Table constructor, e.g. "studentNo*".
+    Rows are dictionary-encoded into a column store as they are read, and duplicate rows are dropped
+    while reading, so only the unique rows of the file are ever held in memory.
+    Note: All values are read as strings.
+
+    Args:
+        path (str): The path of the file.
+        delimiter (Optional[str]): The field delimiter. If None, a tab is used for .tsv/.tab files and a comma otherwise.
+        chunk_size (int): The number of rows read from the file at a time.
+        encoding (str): The text encoding of the file.
+        columnar (bool): If True, the rows are only stored in the column store (see Table).
+
+    Returns:
+        Table: The table read from the file.
+
+    Raises:
+        ValueError: If the file has no header, or a row has a different number of fields than the header.
+    """
+    if delimiter is None:
+        delimiter = "\t" if path.lower().endswith((".tsv", ".tab")) else ","
+    with open(path, newline="", encoding=encoding) as file:
+        reader = csv.reader(file, delimiter=delimiter)
+        header = next(reader, None)
+        if not header:
+            raise ValueError(f"Error: {path} has no header row")
+        encoder = ColumnEncoder(len(header))
+        # Duplicate rows are found by the hash of their codes. Rows with the same hash are compared
+        # against the rows already kept, so a hash collision never drops a row.
+        first_row_with_hash = {}
+        other_rows_with_hash = {}
+        while True:
+            chunk = list(islice(reader, chunk_size))
+            if not chunk:
+                break
+            for row in chunk:
+                # Skip blank lines
+                if not row:
+                    continue
+                if len(row) != len(header):
+                    raise ValueError(f"Error: Row {reader.line_num} of {path} has {len(row)} fields, expected {len(header)}")
+                codes = encoder.encode(row)
+                row_hash = hash(codes)
+                row_index = first_row_with_hash.get(row_hash)
+                if row_index is None:
+                    first_row_with_hash[row_hash] = encoder.row_count
+                elif encoder.row_codes(row_index) == codes or \
+                    any(encoder.row_codes(i) == codes for i in other_rows_with_hash.get(row_hash, [])):
+                    continue
+                else:
+                    other_rows_with_hash.setdefault(row_hash, []).append(encoder.row_count)
+                encoder.append_codes(codes)
+    return Table.from_column_store(header, encoder.to_store(), columnar, rows_are_unique=True)
+
+def load_csv(path: str, **kwargs) -> Table:
+    """
+    Streams a comma-separated file into a Table. See load_delimited.
+    """
+    return load_delimited(path, delimiter=",", **kwargs)
+
+def load_tsv(path: str, **kwargs) -> Table:
+    """
+    Streams a tab-separated file into a Table. See load_delimited.
+    """
+    return load_delimited(path, delimiter="\t", **kwargs)
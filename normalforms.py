@@ -1,30 +1,114 @@
-from typing import List, Tuple, Any
-import copy
+from typing import List, Tuple, Any, Callable, Iterator, Optional, FrozenSet
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+import math
+import time
+import tracemalloc
 from table import Table
+from attributeset import AttributeSet
 import codetotable as mml
+import resultcache
 import util
 
-def create_1NF_tables(tables: List[Table]) -> List[Table]:
+# Counts of the work done by the searches in this process: "fd_checks", "mvd_checks", "search_states",
+# "splits_explored" and "decompositions_scored". Read by normalise to report the work done by each stage.
+search_counters = Counter()
+
+# All create_*NF_tables functions take a workers argument. If it is more than 1, the tables are
+# normalised in parallel by a pool of that many processes (see map_tables).
+# They also take an optional SearchBudget, which limits the time and search states spent on the searches.
+# When it runs out, the best table combination found so far is returned (see SearchBudget).
+
+class SearchBudget:
+    '''
+    Limits the wall time and number of search states of the decomposition searches (see search_decompositions),
+    e.g. create_BCNF_tables(tables, budget=SearchBudget(seconds=60)).
+    When the budget runs out, each search stops expanding states and returns the best table combination found
+    so far (or keeps the table unsplit if none was found yet), and the search is counted as truncated.
+    The time limit is a deadline set when the budget is first used, so a budget passed to several builders
+    (e.g. create_tables_up_to) limits all of them together.
+    Note: With workers > 1, every worker process gets its own copy of the budget, so the state limit
+    applies to each table separately. The deadline is shared.
+    Note: The candidate keys of a table (needed for its starting tables and its prime attributes) are calculated
+    in full and are not limited by the budget. Once the budget has run out, no further tables have their
+    candidate keys calculated. The keys are cached on each table, and are usually already calculated by
+    create_1NF_tables, so the searches only pay for them on tables split off during the search.
+    Table.sample_size makes them faster to calculate on large tables.
+
+    Attributes:
+        seconds (Optional[float]): The wall time limit, or None for no limit.
+        nodes (Optional[int]): The limit on the number of search states expanded, or None for no limit.
+        nodes_expanded (int): The number of search states expanded so far.
+        truncated_searches (int): The number of searches stopped by the budget.
+    '''
+
+    def __init__(self, seconds: Optional[float] = None, nodes: Optional[int] = None):
+        self.seconds = seconds
+        self.nodes = nodes
+        self.nodes_expanded = 0
+        self.truncated_searches = 0
+        self.deadline = None
+
+    @property
+    def exhaustive(self) -> bool:
+        '''
+        Returns True if no search has been stopped by the budget, i.e. every result is the best one.
+        '''
+        return self.truncated_searches == 0
+
+    def start(self) -> None:
+        '''
+        Sets the deadline from the time limit, unless it has already been set.
+        '''
+        if self.deadline is None and self.seconds is not None:
+            self.deadline = time.monotonic() + self.seconds
+
+    def exceeded(self) -> bool:
+        '''
+        Returns True if the budget has run out.
+        '''
+        if self.nodes is not None and self.nodes_expanded >= self.nodes:
+            return True
+        return self.deadline is not None and time.monotonic() >= self.deadline
+
+    def expand(self) -> bool:
+        '''
+        Spends one search state of the budget. Returns False (without spending it) if the budget has run out.
+        '''
+        if self.exceeded():
+            return False
+        self.nodes_expanded += 1
+        return True
+
+def budget_exceeded(budget: Optional[SearchBudget]) -> bool:
+    '''
+    Returns True if there is a budget and it has run out.
+    '''
+    return budget is not None and budget.exceeded()
+
+
+def create_1NF_tables(tables: List[Table], workers: int = 1, budget: Optional[SearchBudget] = None) -> List[Table]:
     '''
     This function will take in a list of tables and
     return the list of tables in the best 1NF form according to MML.
     Working definition of 1NF:
     - There must be a primary key.
     - There are no repeating groups. (Out of scope)
+    There is no decomposition search in 1NF, so the budget is not used.
     '''
-    res = []
-    for table in tables:
-        best_combination, _ = table.calculate_best_primary_keys()
-        new_keys = [f"{col}*" if col in best_combination else col for col in table.keys]
+    return map_tables(best_1NF_table, tables, workers)
 
-        # Create new table data with the updated keys
-        new_table_data = [new_keys] + table.rows
+def best_1NF_table(table: Table) -> Table:
+    '''
+    Returns the table with its best primary keys according to MML.
+    '''
+    best_combination, _ = table.calculate_best_primary_keys()
 
-        # Return a new Table object with the updated data
-        res.append(Table(new_table_data))
-    return res
+    # Return a new Table object with the updated keys
+    return table.project(table.keys, primary_keys=best_combination)
 
-def create_2NF_tables(tables: List[Table]) -> List[Table]:
+def create_2NF_tables(tables: List[Table], workers: int = 1, budget: Optional[SearchBudget] = None) -> List[Table]:
     '''
     This function will take in a list of tables and 
     return the list of tables in the best 2NF form according to MML.
@@ -32,71 +116,10 @@ def create_2NF_tables(tables: List[Table]) -> List[Table]:
     - The table is in 1NF.
     - No non-prime attribute in the table is partially dependent on any candidate key.
     '''
-    possible_tables = []
-    def recursive_split(mainTable: Table, otherTables: List[Table] = []):
-        '''
-        This function will recursively split a table into two tables using all possible partial dependencies.
-        If the table cannot be split anymore, the tables will be added to the possible_tables list.
-        In essence this function will find all possible table combinations that can be created from the given table 
-        while following 2NF rules.
-        '''
-        p_key_subsets = util.get_all_combinations_except_all(mainTable.primary_keys)
-        n_key_subsets = util.get_all_combinations(mainTable.non_prime_attributes)
-        for p_key_subset in p_key_subsets:
-            for n_key_subset in n_key_subsets:
-                if possible_functional_dependency(mainTable, p_key_subset, n_key_subset):
-                    a, b = split_table(mainTable, p_key_subset, n_key_subset)
-                    recursive_split(a, otherTables + [b])
-                    recursive_split(b, otherTables + [a])
-        # This ensures that the appended combination is in 2NF
-        if cannot_be_split_further(mainTable):
-            for table in otherTables:
-                if not cannot_be_split_further(table):
-                    break
-            else:
-                possible_tables.append([mainTable] + otherTables)
-
-    def cannot_be_split_further(table: Table) -> bool:
-        p_key_subsets = util.get_all_combinations_except_all(table.primary_keys)
-        n_key_subsets = util.get_all_combinations(table.non_prime_attributes)
-        for p_key_subset in p_key_subsets:
-            for n_key_subset in n_key_subsets:
-                if possible_functional_dependency(table, p_key_subset, n_key_subset):
-                    return False
-        return True
+    # Run the search on all candidate keys of each table
+    return create_normal_form_tables(tables, partial_dependencies, split_table, all_candidate_tables, workers=workers, budget=budget)
 
-    # Stores all possible 2NF table combinations for each table in tables
-    all_table_list = []
-    for table in tables:
-        possible_tables = []
-        # Run recursive_split() on all candidate keys of the table
-        candidate_tables = all_candidate_tables(table)
-        for t in candidate_tables:
-            recursive_split(t)
-        # Guarantees 2NF even if its MML value is worse than 1NF
-        # Checks to see if there have been any splitting of tables; if so, remove all unsplit tables
-        if max(len(comb) for comb in possible_tables) > 1:
-            for comb in possible_tables:
-                possible_tables = [comb for comb in possible_tables if len(comb) > 1]
-        all_table_list.append(possible_tables)
-    # Use below line to help debug
-    # return all_table_list
-
-    # For each table in tables, finds the best 2NF table combination according to MML.
-    # This uses the combinations identified previously.
-    best_2nf_tables = []
-    for table_list in all_table_list:
-        best_mml = float('inf')
-        best_table_combination = []
-        for table_combination in table_list:
-            if calculate_mml(table_combination) < best_mml:
-                best_mml = calculate_mml(table_combination)
-                best_table_combination = table_combination
-        best_2nf_tables.append(best_table_combination)
-
-    return util.flattenlist(best_2nf_tables)
-
-def create_3NF_tables(tables: List[Table]) -> List[Table]:
+def create_3NF_tables(tables: List[Table], workers: int = 1, budget: Optional[SearchBudget] = None) -> List[Table]:
     '''
     This function will take in a list of tables and 
     return the list of tables in the best 3NF form according to MML.
@@ -104,75 +127,10 @@ def create_3NF_tables(tables: List[Table]) -> List[Table]:
     - The table is in 2NF
     - No non-prime attribute in the table is transitively dependent on the primary key.
     '''
-    possible_tables = []
-    def recursive_split(mainTable: Table, otherTables: List[Table] = []):
-        '''
-        This function will recursively split a table into two tables using all possible transitive dependencies.
-        If the table cannot be split anymore, the tables will be added to the possible_tables list.
-        In essence this function will find all possible table combinations that can be 
-        created from the given table while following 3NF rules.
-        '''
-        nonprimary_key_subsets = util.get_all_combinations_except_all(mainTable.non_primary_keys)
-        nonprime_key_subsets = util.get_all_combinations(mainTable.non_prime_attributes)
-        for nonprimary_key_subset in nonprimary_key_subsets:
-            for nonprime_key_subset in nonprime_key_subsets:
-                # Skip the iteration if there are any common attributes in the two subsets
-                if len(set(nonprimary_key_subset).intersection(set(nonprime_key_subset))) > 0:
-                    continue
-                if possible_functional_dependency(mainTable, nonprimary_key_subset, nonprime_key_subset):
-                    a, b = split_table(mainTable, nonprimary_key_subset, nonprime_key_subset)
-                    recursive_split(a, otherTables + [b])
-                    recursive_split(b, otherTables + [a])
-        # This ensures that the appended combination is in 3NF
-        if cannot_be_split_further(mainTable):
-            for table in otherTables:
-                if not cannot_be_split_further(table):
-                    break
-            else:
-                possible_tables.append([mainTable] + otherTables)
-
-    def cannot_be_split_further(table: Table) -> bool:
-        nonprimary_key_subsets = util.get_all_combinations_except_all(table.non_primary_keys)
-        nonprime_key_subsets = util.get_all_combinations(table.non_prime_attributes)
-        for nonprimary_key_subset in nonprimary_key_subsets:
-            for nonprime_key_subset in nonprime_key_subsets:
-                # Skip the iteration if there are any common attributes in the two subsets
-                if len(set(nonprimary_key_subset).intersection(set(nonprime_key_subset))) > 0:
-                    continue
-                if possible_functional_dependency(table, nonprimary_key_subset, nonprime_key_subset):
-                    return False
-        return True
+    # Unlike the other NFs, the search only runs on the current primary key of each table
+    return create_normal_form_tables(tables, transitive_dependencies, split_table, current_table_only, workers=workers, budget=budget)
 
-    # Stores all possible 3NF table combinations for each table in tables
-    all_table_list = []
-    for table in tables:
-        possible_tables = []
-        recursive_split(table)
-        # Guarantees 3NF even if its MML value is worse than 2NF
-        # Checks to see if there have been any splitting of tables; if so, remove all unsplit tables
-        if max(len(comb) for comb in possible_tables) > 1:
-            for comb in possible_tables:
-                possible_tables = [comb for comb in possible_tables if len(comb) > 1]
-        all_table_list.append(possible_tables)
-    # Use below line to help debug
-    # return all_table_list
-
-    # For each table in tables, finds the best 3NF table combination according to MML.
-    # This uses the combinations identified previously.
-    best_3nf_tables = []
-    for table_list in all_table_list:
-        best_mml = float('inf')
-        best_table_combination = []
-        for table_combination in table_list:
-            if calculate_mml(table_combination) < best_mml:
-                best_mml = calculate_mml(table_combination)
-                best_table_combination = table_combination
-        best_3nf_tables.append(best_table_combination)
-
-    return util.flattenlist(best_3nf_tables)
-
-
-def create_BCNF_tables(tables: List[Table]) -> List[Table]:
+def create_BCNF_tables(tables: List[Table], workers: int = 1, budget: Optional[SearchBudget] = None) -> List[Table]:
     '''
     This function will take in a list of tables and
     return the list of tables in the best BCNF form according to MML.
@@ -181,71 +139,10 @@ def create_BCNF_tables(tables: List[Table]) -> List[Table]:
     Essentially does the same as 3NF but also looks for functional dependencies
     with prime attributes.
     '''
-    possible_tables = []
-    def recursive_split(mainTable: Table, otherTables: List[Table] = []):
-        primary_key_subsets = util.get_all_combinations_except_all(mainTable.primary_keys)
-        prime_key_subsets = util.get_all_combinations(mainTable.prime_attributes)
-        for primary_key_subset in primary_key_subsets:
-            for prime_key_subset in prime_key_subsets:
-                # Skip the iteration if there are any common attributes in the two subsets
-                if len(set(primary_key_subset).intersection(set(prime_key_subset))) > 0:
-                    continue
-                if possible_functional_dependency(mainTable, primary_key_subset, prime_key_subset):
-                    a, b = split_table(mainTable, primary_key_subset, prime_key_subset)
-                    recursive_split(a, otherTables + [b])
-                    recursive_split(b, otherTables + [a])
-        # This ensures that the appended combination is in BCNF
-        if cannot_be_split_further(mainTable):
-            for table in otherTables:
-                if not cannot_be_split_further(table):
-                    break
-            else:
-                possible_tables.append([mainTable] + otherTables)
-
-    def cannot_be_split_further(table: Table) -> bool:
-        primary_key_subsets = util.get_all_combinations_except_all(table.primary_keys)
-        prime_key_subsets = util.get_all_combinations(table.prime_attributes)
-        for primary_key_subset in primary_key_subsets:
-            for prime_key_subset in prime_key_subsets:
-                # Skip the iteration if there are any common attributes in the two subsets
-                if len(set(primary_key_subset).intersection(set(prime_key_subset))) > 0:
-                    continue
-                if possible_functional_dependency(table, primary_key_subset, prime_key_subset):
-                    return False
-        return True
+    # Run the search on all candidate keys of each table
+    return create_normal_form_tables(tables, prime_attribute_dependencies, split_table, all_candidate_tables, workers=workers, budget=budget)
 
-    # Stores all possible BCNF table combinations for each table in tables
-    all_table_list = []
-    for table in tables:
-        possible_tables = []
-        # Run recursive_split() on all candidate keys of the table
-        candidate_tables = all_candidate_tables(table)
-        for t in candidate_tables:
-            recursive_split(t)
-        # Guarantees BCNF even if its MML value is worse than 3NF
-        # Checks to see if there have been any splitting of tables; if so, remove all unsplit tables
-        if max(len(comb) for comb in possible_tables) > 1:
-            for comb in possible_tables:
-                possible_tables = [comb for comb in possible_tables if len(comb) > 1]
-        all_table_list.append(possible_tables)
-    # Use below line to help debug
-    # return all_table_list
-
-    # For each table in tables, finds the best BCNF table combination according to MML.
-    # This uses the combinations identified previously.
-    best_bcnf_tables = []
-    for table_list in all_table_list:
-        best_mml = float('inf')
-        best_table_combination = []
-        for table_combination in table_list:
-            if calculate_mml(table_combination) < best_mml:
-                best_mml = calculate_mml(table_combination)
-                best_table_combination = table_combination
-        best_bcnf_tables.append(best_table_combination)
-
-    return util.flattenlist(best_bcnf_tables)
-
-def create_4NF_tables(tables: List[Table]) -> List[Table]:
+def create_4NF_tables(tables: List[Table], workers: int = 1, budget: Optional[SearchBudget] = None) -> List[Table]:
     '''
     This function will take in a list of tables and return the list of tables in the best 4NF form according to MML.
     Working definition of 4NF:
@@ -255,136 +152,333 @@ def create_4NF_tables(tables: List[Table]) -> List[Table]:
         - For a single value of A in the dependency A -> B, multiple values of B exist.
         - For the table T(A, B, C), if A -> B, then B and C must be independent of each other.
     '''
+    # Run the search on all candidate keys of each table
+    # The unsplit table is always kept as a possible combination
+    return create_normal_form_tables(tables, illegal_multivalued_dependencies, split_table_4NF_without_anomalies, \
+        all_candidate_tables, keep_unsplit_table=True, workers=workers, budget=budget)
+
+def create_normal_form_tables(tables: List[Table], find_dependencies: Callable[[Table], Iterator[Tuple[Tuple[str, ...], Tuple[str, ...]]]], \
+    split: Callable[[Table, Tuple[str, ...], Tuple[str, ...]], Optional[Tuple[Table, Table]]], \
+    starting_tables: Callable[[Table], List[Table]], keep_unsplit_table: bool = False, workers: int = 1, \
+    budget: Optional[SearchBudget] = None) -> List[Table]:
+    '''
+    This function holds the search shared by the 2NF, 3NF, BCNF and 4NF builders.
+    For each table in tables, every table in starting_tables(table) is recursively split using the
+    dependencies yielded by find_dependencies, and the table combination with the best MML is kept.
+    The split function returns the two tables of a split, or None if the split is not allowed.
+    All function arguments must be module-level functions, so they can be sent to worker processes.
+    '''
+    search = partial(best_table_combination, find_dependencies=find_dependencies, split=split, \
+        starting_tables=starting_tables, keep_unsplit_table=keep_unsplit_table)
+    if budget is None:
+        return util.flattenlist(map_tables(search, tables, workers))
+    budget.start()
+    if not uses_worker_processes(tables, workers):
+        return util.flattenlist(map_tables(partial(search, budget=budget), tables, workers))
+    # Worker processes use copies of the budget, so the work they record is added back to it
+    results = map_tables(partial(budgeted_table_combination, search=search, budget=budget), tables, workers)
+    for _, nodes_expanded, truncated_searches in results:
+        budget.nodes_expanded += nodes_expanded
+        budget.truncated_searches += truncated_searches
+    return util.flattenlist(best_tables for best_tables, _, _ in results)
+
+def budgeted_table_combination(table: Table, search: Callable[..., List[Table]], budget: SearchBudget) -> Tuple[List[Table], int, int]:
+    '''
+    Runs search (a partial of best_table_combination) on a table with a budget, and returns the best table
+    combination with the number of search states expanded and searches truncated on the way.
+    '''
+    nodes_expanded, truncated_searches = budget.nodes_expanded, budget.truncated_searches
+    best_tables = search(table, budget=budget)
+    return best_tables, budget.nodes_expanded - nodes_expanded, budget.truncated_searches - truncated_searches
+
+def best_table_combination(table: Table, find_dependencies: Callable[[Table], Iterator[Tuple[Tuple[str, ...], Tuple[str, ...]]]], \
+    split: Callable[[Table, Tuple[str, ...], Tuple[str, ...]], Optional[Tuple[Table, Table]]], \
+    starting_tables: Callable[[Table], List[Table]], keep_unsplit_table: bool = False, \
+    budget: Optional[SearchBudget] = None) -> List[Table]:
+    '''
+    Returns the best table combination for a single table according to MML (see create_normal_form_tables).
+    '''
+    # Once the budget has run out, the candidate keys needed for the starting tables are not calculated either
+    if budget_exceeded(budget):
+        budget.truncated_searches += 1
+        return [table]
+    best_split_tables, best_unsplit_tables = search_decompositions(starting_tables(table), find_dependencies, split, budget)
+    if keep_unsplit_table and (not best_unsplit_tables or calculate_mml([table]) <= calculate_mml(best_unsplit_tables)):
+        best_unsplit_tables = [table]
+    # Guarantees the NF even if its MML value is worse than the previous NF
+    # If there has been any splitting of tables, the unsplit tables are ignored
+    if best_split_tables:
+        return best_split_tables
+    if best_unsplit_tables:
+        return best_unsplit_tables
+    # No table combination follows the rules of the NF, so the table is kept as is
+    return [table]
+
+def map_tables(function: Callable[[Table], Any], tables: List[Table], workers: int = 1) -> List[Any]:
+    '''
+    Applies function to every table in tables and returns the results in the same order as tables.
+    If workers is more than 1, the tables are processed in parallel by a pool of that many processes.
+    The function must be picklable, i.e. a module-level function or a functools.partial of one.
+    Note: Each worker process has its own dependency cache (see resultcache.py).
+    '''
+    if uses_worker_processes(tables, workers):
+        with ProcessPoolExecutor(max_workers=min(workers, len(tables))) as executor:
+            return list(executor.map(function, tables))
+    return [function(table) for table in tables]
+
+def uses_worker_processes(tables: List[Table], workers: int) -> bool:
+    '''
+    Returns True if map_tables processes the tables in worker processes.
+    '''
+    return workers > 1 and len(tables) > 1
+
+def search_decompositions(starting_tables: List[Table], find_dependencies: Callable[[Table], Iterator[Tuple[Tuple[str, ...], Tuple[str, ...]]]], \
+    split: Callable[[Table, Tuple[str, ...], Tuple[str, ...]], Optional[Tuple[Table, Table]]], \
+    budget: Optional[SearchBudget] = None) -> Tuple[List[Table], List[Table]]:
+    '''
+    This function will recursively split a table into two tables using all dependencies yielded by find_dependencies.
+    If the table cannot be split anymore (and neither can the tables split off before it), the tables form a 
+    possible table combination following the rules of the NF, which is scored using MML.
+    Returns the best table combination that splits the table, and the best one that leaves it unsplit 
+    (either can be an empty list if none were found). Ties are won by the combination found first.
+
+    All tables in the search are projections of the same table, so a table is identified by its columns and 
+    primary keys (see decomposition_signature). Each search state is only expanded once, no matter how many
+    split orders lead to it. A search state is also not expanded if its MML lower bound (see mml_lower_bound)
+    is already worse than the best table combination found so far.
+    If the budget runs out, no further search states are expanded and the best combinations found so far are returned.
+    The search is depth-first, so a complete table combination is usually scored after only a few states.
+    '''
+    best = {"split": ([], float('inf')), "unsplit": ([], float('inf'))}
+    truncated = False
+    # Splitting never removes attributes, so every combination has the same total number of attributes
+    attributecount = len(starting_tables[0].keys) if starting_tables else 0
+    # Transposition table of the search states that have already been expanded
+    expanded_states = set()
+    # Caches whether a table (by signature) cannot be split further
+    normal_form_cache = {}
+    # The MML lengths of the tables split off in the current search state, updated as tables are split off and put back.
+    # It caches the lengths of every table of the search, so a table reached by several split orders is only
+    # scored once, while the tables themselves (and their cached partitions) are freed once the search moves on.
+    other_mml = IncrementalMML(attributecount)
+
+    def cannot_be_split_further(table: Table) -> bool:
+        nonlocal truncated
+        signature = table_signature(table)
+        if signature not in normal_form_cache:
+            has_no_dependency = next(find_dependencies(table, budget), None) is None
+            # If the budget ran out, the table may still have dependencies, so it is not treated as being in the NF
+            if budget_exceeded(budget):
+                truncated = True
+                return False
+            normal_form_cache[signature] = has_no_dependency
+        return normal_form_cache[signature]
+
     def recursive_split(mainTable: Table, otherTables: List[Table] = []):
-        '''
-        This function will look for multivalued dependencies and split if their union is not a superkey.
-        '''
-        key_subsets = util.get_all_combinations_except_all(mainTable.keys)
-        for key_subset1 in key_subsets:
-            for key_subset2 in key_subsets:
-                # Skip the iteration if there are any common attributes in the two subsets
-                if len(set(key_subset1).intersection(set(key_subset2))) > 0:
-                    continue
-                # Skip the iteration if the union of the two subsets is a superkey
-                unionset = set(key_subset1).union(set(key_subset2))
-                is_superkey = False
-                for candidate_key in mainTable.candidate_keys:
-                    if set(candidate_key).issubset(unionset):
-                        is_superkey = True
-                if is_superkey:
-                    continue
-                # Split if an illegal multivalued dependency is found
-                if possible_multivalued_dependency(mainTable, key_subset1, key_subset2):
-                    # Uses a different split_table call than previous NFs
-                    a, b = split_table_4NF(mainTable, key_subset1, key_subset2)
-                    # Check if no data anomalies are created
-                    if no_data_anomalies(mainTable, a, b):
-                        recursive_split(a, otherTables + [b])
-                        recursive_split(b, otherTables + [a])
-        # This ensures that the appended combination is in 4NF
-        if cannot_be_split_further(mainTable):
+        state = decomposition_signature(mainTable, otherTables)
+        if state in expanded_states:
+            return
+        expanded_states.add(state)
+        # Prune the search state if it cannot lead to a better table combination
+        # The unsplit table combinations are kept separately, so they are never used for pruning
+        if round(mml_lower_bound(mainTable, other_mml) - 1e-6, 2) > best["split"][1]:
+            return
+        nonlocal truncated
+        if budget is not None and not budget.expand():
+            truncated = True
+            return
+        search_counters["search_states"] += 1
+        has_dependency = False
+        for keyset1, keyset2 in find_dependencies(mainTable, budget):
+            has_dependency = True
+            # Finding the dependencies of a wide table can take long, so the budget is also checked between splits
+            if budget_exceeded(budget):
+                truncated = True
+                return
+            search_counters["splits_explored"] += 1
+            split_tables = split(mainTable, keyset1, keyset2)
+            if split_tables is None:
+                continue
+            a, b = split_tables
+            other_mml.add(b)
+            recursive_split(a, otherTables + [b])
+            other_mml.swap(b, a)
+            recursive_split(b, otherTables + [a])
+            other_mml.remove(a)
+        # If the budget ran out, the dependencies of the table may not all have been found
+        if budget_exceeded(budget):
+            truncated = True
+            return
+        normal_form_cache[table_signature(mainTable)] = not has_dependency
+        # This ensures that the scored combination is in the NF
+        if not has_dependency:
             for table in otherTables:
                 if not cannot_be_split_further(table):
                     break
             else:
-                possible_tables.append([mainTable] + otherTables)
+                table_combination = [mainTable] + otherTables
+                kind = "split" if otherTables else "unsplit"
+                search_counters["decompositions_scored"] += 1
+                # Every attribute is in the combination, so this is calculate_mml with the cached lengths
+                mml_value = mml.I_from_lengths(attributecount, [(len(table.keys), len(table.primary_keys), \
+                    other_mml.table_lengths(table)[1]) for table in table_combination])
+                if mml_value < best[kind][1]:
+                    best[kind] = (table_combination, mml_value)
+
+    for table in starting_tables:
+        recursive_split(table)
+    if truncated:
+        budget.truncated_searches += 1
+    return best["split"][0], best["unsplit"][0]
 
-    def cannot_be_split_further(table: Table) -> bool:
-        key_subsets = util.get_all_combinations_except_all(table.keys)
-        for key_subset1 in key_subsets:
-            for key_subset2 in key_subsets:
-                # Skip the iteration if there are any common attributes in the two subsets
-                if len(set(key_subset1).intersection(set(key_subset2))) > 0:
-                    continue
-                # Skip the iteration if the union of the two subsets is a superkey
-                unionset = set(key_subset1).union(set(key_subset2))
-                is_superkey = False
-                for candidate_key in table.candidate_keys:
-                    if set(candidate_key).issubset(unionset):
-                        is_superkey = True
-                if is_superkey:
-                    continue
-                # Return False if an illegal multivalued dependency is found
-                if possible_multivalued_dependency(table, key_subset1, key_subset2):
-                    return False
-        return True
+def mml_lower_bound(mainTable: Table, other_mml: "IncrementalMML") -> float:
+    '''
+    Returns a lower bound for the MML value (before rounding) of any table combination that can be 
+    created by splitting mainTable further, while keeping the tables of other_mml as they are.
+    - The tables of other_mml are counted exactly, except for primary key weightings that cannot be calculated.
+    - mainTable becomes at least one table, which costs at least log2(a) + 1 bits in #H.
+    - Every column of mainTable ends up in a table with at least as many rows as the column has unique values,
+      and a column's unique count does not change when splitting, so the column costs at least 
+      unique count * log2(unique count) bits in #A.
+    All other terms of #H and #A are non-negative, so they are left out.
+    '''
+    bound = (other_mml.table_count + 1) * (math.log2(other_mml.attributecount) + 1) + other_mml.total_length
+    bound += sum(count * math.log2(count) for count in mainTable.unique_counts if count > 0)
+    return bound
+
+def table_signature(table: Table) -> Tuple[FrozenSet[str], FrozenSet[str]]:
+    '''
+    Tables created while searching for decompositions are all projections of the same table, 
+    so their data is determined by their columns. Returns the column names and primary keys of the table.
+    '''
+    return (frozenset(table.keys), frozenset(table.primary_keys))
+
+def decomposition_signature(mainTable: Table, otherTables: List[Table]) -> Tuple[Any, FrozenSet[Any]]:
+    '''
+    Returns a canonical signature for a search state, i.e. the table that is being split along with the tables 
+    that have already been split off. The order in which the other tables were split off does not matter.
+    '''
+    other_signatures = Counter(table_signature(table) for table in otherTables)
+    return (table_signature(mainTable), frozenset(other_signatures.items()))
+
+# The dependency generators below take an optional SearchBudget. Enumerating the subset pairs of a wide table can
+# take long even when no dependency is found, so they stop early once the budget has run out. The caller must then
+# check the budget, as stopping early looks the same as having no more dependencies (see search_decompositions).
+
+def partial_dependencies(table: Table, budget: Optional[SearchBudget] = None) -> Iterator[Tuple[Tuple[str, ...], Tuple[str, ...]]]:
+    '''
+    Yields all partial dependencies of the table, i.e. the functional dependencies from a proper subset
+    of the primary keys to a set of non-prime attributes. A table with none of these is in 2NF.
+    '''
+    p_key_subsets = util.get_all_combinations_except_all(table.primary_keys)
+    n_key_subsets = util.get_all_combinations(table.non_prime_attributes)
+    for p_key_subset in p_key_subsets:
+        for n_key_subset in n_key_subsets:
+            if budget_exceeded(budget):
+                return
+            if possible_functional_dependency(table, p_key_subset, n_key_subset):
+                yield p_key_subset, n_key_subset
+
+def transitive_dependencies(table: Table, budget: Optional[SearchBudget] = None) -> Iterator[Tuple[Tuple[str, ...], Tuple[str, ...]]]:
+    '''
+    Yields all transitive dependencies of the table, i.e. the functional dependencies from a set of 
+    non-primary keys to a disjoint set of non-prime attributes. A table with none of these is in 3NF.
+    '''
+    nonprimary_key_subsets = attribute_subsets(table, util.get_all_combinations_except_all(table.non_primary_keys))
+    nonprime_key_subsets = attribute_subsets(table, util.get_all_combinations(table.non_prime_attributes))
+    for nonprimary_key_subset, nonprimary_key_set in nonprimary_key_subsets:
+        if budget_exceeded(budget):
+            return
+        for nonprime_key_subset, nonprime_key_set in nonprime_key_subsets:
+            # Skip the iteration if there are any common attributes in the two subsets
+            if not nonprimary_key_set.isdisjoint(nonprime_key_set):
+                continue
+            if budget_exceeded(budget):
+                return
+            if possible_functional_dependency(table, nonprimary_key_subset, nonprime_key_subset):
+                yield nonprimary_key_subset, nonprime_key_subset
+
+def prime_attribute_dependencies(table: Table, budget: Optional[SearchBudget] = None) -> Iterator[Tuple[Tuple[str, ...], Tuple[str, ...]]]:
+    '''
+    Yields all functional dependencies from a proper subset of the primary keys to a disjoint set of 
+    prime attributes. A table with none of these is in BCNF.
+    '''
+    primary_key_subsets = attribute_subsets(table, util.get_all_combinations_except_all(table.primary_keys))
+    prime_key_subsets = attribute_subsets(table, util.get_all_combinations(table.prime_attributes))
+    for primary_key_subset, primary_key_set in primary_key_subsets:
+        if budget_exceeded(budget):
+            return
+        for prime_key_subset, prime_key_set in prime_key_subsets:
+            # Skip the iteration if there are any common attributes in the two subsets
+            if not primary_key_set.isdisjoint(prime_key_set):
+                continue
+            if budget_exceeded(budget):
+                return
+            if possible_functional_dependency(table, primary_key_subset, prime_key_subset):
+                yield primary_key_subset, prime_key_subset
+
+def illegal_multivalued_dependencies(table: Table, budget: Optional[SearchBudget] = None) -> Iterator[Tuple[Tuple[str, ...], Tuple[str, ...]]]:
+    '''
+    Yields all multivalued dependencies X ->> Y of the table where {X, Y} is not a superkey.
+    A table with none of these is in 4NF.
+    '''
+    key_subsets = attribute_subsets(table, util.get_all_combinations_except_all(table.keys))
+    candidate_key_sets = table.candidate_key_sets
+    for key_subset1, key_set1 in key_subsets:
+        if budget_exceeded(budget):
+            return
+        for key_subset2, key_set2 in key_subsets:
+            # Skip the iteration if there are any common attributes in the two subsets
+            if not key_set1.isdisjoint(key_set2):
+                continue
+            # Skip the iteration if the union of the two subsets is a superkey
+            unionset = key_set1 | key_set2
+            if any(candidate_key_set.issubset(unionset) for candidate_key_set in candidate_key_sets):
+                continue
+            if budget_exceeded(budget):
+                return
+            if possible_multivalued_dependency(table, key_subset1, key_subset2):
+                yield key_subset1, key_subset2
+
+def attribute_subsets(table: Table, subsets: List[Tuple[str, ...]]) -> List[Tuple[Tuple[str, ...], AttributeSet]]:
+    '''
+    Pairs each subset of keys with its AttributeSet, so the subsets can be compared with integer operations
+    in the dependency loops instead of being turned into sets for every comparison.
+    '''
+    return [(subset, table.attribute_set(subset)) for subset in subsets]
 
-    # Stores all possible 4NF table combinations for each table in tables
-    all_table_list = []
-    for table in tables:
-        possible_tables = [[table]]
-        # Run recursive_split() on all candidate keys of the table
-        candidate_tables = all_candidate_tables(table)
-        for t in candidate_tables:
-            recursive_split(t)
-        # Guarantees 4NF even if its MML value is worse than BCNF
-        # Checks to see if there have been any splitting of tables; if so, remove all unsplit tables
-        if max(len(comb) for comb in possible_tables) > 1:
-            for comb in possible_tables:
-                possible_tables = [comb for comb in possible_tables if len(comb) > 1]
-        all_table_list.append(possible_tables)
-    # Use below line to help debug
-    # return all_table_list
-
-    # For each table in tables, finds the best 4NF table combination according to MML.
-    # This uses the combinations identified previously.
-    best_4nf_tables = []
-    for table_list in all_table_list:
-        best_mml = float('inf')
-        best_table_combination = []
-        for table_combination in table_list:
-            if calculate_mml(table_combination) < best_mml:
-                best_mml = calculate_mml(table_combination)
-                best_table_combination = table_combination
-        best_4nf_tables.append(best_table_combination)
-
-    return util.flattenlist(best_4nf_tables)
-
-def create_5NF_tables(tables: List[Table]) -> List[Table]:
+def create_5NF_tables(tables: List[Table], workers: int = 1, budget: Optional[SearchBudget] = None) -> List[Table]:
     '''
     This function will essentially just split tables with 3 columns whenever possible.
     Note: Scope of 5NF is limited to tables with 3 columns only.
+    There is no decomposition search in 5NF, so the budget is not used.
     '''
-    def split(mainTable: Table):
-        if len(mainTable.keys) == 3:
-            # Uses a different split_table call than previous NFs
-            a, b, c = split_table_5NF(mainTable)
-            if is_lossless_5NF(mainTable, (a, b, c)):
-                possible_tables.append([a, b, c])
-        else:
-            possible_tables.append([mainTable])
-
-    # Stores all possible 5NF table combinations for each table in tables
-    all_table_list = []
-    for table in tables:
-        possible_tables = [[table]]
-        split(table)
-        # Guarantees 5NF even if its MML value is worse than 4NF
-        # Checks to see if there have been any splitting of tables; if so, remove all unsplit tables
-        if max(len(comb) for comb in possible_tables) > 1:
-            for comb in possible_tables:
-                possible_tables = [comb for comb in possible_tables if len(comb) > 1]
-        all_table_list.append(possible_tables)
+    return util.flattenlist(map_tables(best_5NF_table_combination, tables, workers))
+
+def best_5NF_table_combination(table: Table) -> List[Table]:
+    '''
+    Returns the best 5NF table combination for a single table according to MML.
+    '''
+    # Stores all possible 5NF table combinations for the table
+    possible_tables = [[table]]
+    if len(table.keys) == 3:
+        # Uses a different split_table call than previous NFs
+        a, b, c = split_table_5NF(table)
+        if is_lossless_5NF(table, (a, b, c)):
+            possible_tables.append([a, b, c])
+    # Guarantees 5NF even if its MML value is worse than 4NF
+    # Checks to see if there have been any splitting of tables; if so, remove all unsplit tables
+    if max(len(comb) for comb in possible_tables) > 1:
+        possible_tables = [comb for comb in possible_tables if len(comb) > 1]
     # Use below lines to help debug
-    # for comb in all_table_list:
-    #     for c in comb:
-    #         for table in c:
-    #             table.debug()
-    #             print("\n")
-
-    # For each table in tables, finds the best 5NF table combination according to MML.
-    # This uses the combinations identified previously.
-    best_5nf_tables = []
-    for table_list in all_table_list:
-        best_mml = float('inf')
-        best_table_combination = []
-        for table_combination in table_list:
-            if calculate_mml(table_combination) < best_mml:
-                best_mml = calculate_mml(table_combination)
-                best_table_combination = table_combination
-        best_5nf_tables.append(best_table_combination)
-
-    return util.flattenlist(best_5nf_tables)
+    # for comb in possible_tables:
+    #     for t in comb:
+    #         t.debug()
+    #         print("\n")
+
+    # Finds the best 5NF table combination according to MML (the first one wins ties)
+    mml_values = calculate_mml_batch(possible_tables)
+    return possible_tables[mml_values.index(min(mml_values))]
 
 def calculate_mml(tables: List[Table]) -> float:
     '''
@@ -392,28 +486,92 @@ def calculate_mml(tables: List[Table]) -> float:
     '''
     if len(tables) == 0 or tables == [[]]:
         return None
-    # Calculate tabletotal
-    tablecount = len(tables)
-    # Holds atpttuples
-    tuplelist = []
-    # Holds data
-    datalist = []
-    # Holds all seen attributes in the table list
-    attributeset = set()
-    for table in tables:
-        attributeset.update(table.keys)
-        # Calculate at
-        attributecount = len(table.keys)
-        # Calculate pt
-        primarykeycount = len(table.primary_keys)
-        # Append to tuplelist
-        tuplelist.append((attributecount, primarykeycount))
-        # Append to datalist
-        datalist.append((len(table.rows), table.unique_counts))
-    # Calculate a
-    attributecount = len(attributeset)
-    # Call and return I() with respective arguments
-    return mml.I(tablecount, attributecount, tuplelist, datalist)
+    return calculate_mml_batch([tables])[0]
+
+def calculate_mml_batch(table_combinations: List[List[Table]]) -> List[float]:
+    '''
+    Function that takes as input a list of (non-empty) table combinations and returns the MML encoding value
+    of each one. The #A length of each table is cached on the table (see Table.data_message_length), 
+    so tables shared between combinations are only scored once.
+    '''
+    search_counters["decompositions_scored"] += len(table_combinations)
+    mml_values = []
+    for tables in table_combinations:
+        # Holds all seen attributes in the table list
+        attributeset = set()
+        for table in tables:
+            attributeset.update(table.keys)
+        mml_values.append(mml.I_from_lengths(len(attributeset), \
+            [(len(table.keys), len(table.primary_keys), table.data_message_length) for table in tables]))
+    return mml_values
+
+class IncrementalMML:
+    '''
+    Keeps track of the MML value of a table combination while tables are added, removed or swapped,
+    updating the total in O(1) per change. The lengths of each table are cached by its columns and primary keys
+    (in order), so equal projections are only scored once and the tables themselves are not kept.
+    All tables must be projections of the same set of attributes (e.g. the tables of a search), 
+    so the total number of attributes does not change.
+    A table without primary keys has no primary key weighting, so it is counted by the rest of its #H length,
+    which makes the value a lower bound (see mml_lower_bound).
+    Note: The total is updated by adding and subtracting, so before rounding it can differ from 
+    calculate_mml in the last few bits. Use calculate_mml to compare the values of two combinations exactly.
+    '''
+
+    def __init__(self, attributecount: int, tables: List[Table] = []):
+        self.attributecount = attributecount
+        self.table_count = 0
+        # The sum of the #H and #A lengths of the tables in the combination
+        self.total_length = float(0)
+        self._lengths = {}
+        for table in tables:
+            self.add(table)
+
+    def table_lengths(self, table: Table) -> Tuple[float, float]:
+        '''
+        Returns the length of a single table in #H (without the per-table terms of value) and in #A.
+        '''
+        signature = (tuple(table.keys), tuple(table.primary_keys))
+        if signature not in self._lengths:
+            at, pt = len(table.keys), len(table.primary_keys)
+            if 1 <= pt <= at:
+                header_length = mml.table_H(self.attributecount, at, pt)
+            else:
+                header_length = math.log2(math.comb(self.attributecount, at)) + math.log2(at) + math.log2(math.comb(at, pt))
+            data_length = table.data_message_length if table.row_count > 0 else float(0)
+            self._lengths[signature] = (header_length, data_length)
+        return self._lengths[signature]
+
+    def _table_length(self, table: Table) -> float:
+        header_length, data_length = self.table_lengths(table)
+        return header_length + data_length
+
+    def add(self, table: Table) -> None:
+        '''
+        Adds a table to the combination.
+        '''
+        self.table_count += 1
+        self.total_length += self._table_length(table)
+
+    def remove(self, table: Table) -> None:
+        '''
+        Removes a table that was added to the combination.
+        '''
+        self.table_count -= 1
+        self.total_length -= self._table_length(table)
+
+    def swap(self, old_table: Table, new_table: Table) -> None:
+        '''
+        Replaces a table of the combination by another table.
+        '''
+        self.total_length += self._table_length(new_table) - self._table_length(old_table)
+
+    def value(self) -> float:
+        '''
+        Returns the MML value of the current table combination, as calculate_mml would.
+        '''
+        # Every table also costs log2(a) bits and 1 bit (unary coding of the table count) in #H
+        return round(self.table_count * (mml.log2(self.attributecount) + 1) + self.total_length, 2)
 
 def possible_functional_dependency(table: Table, keyset1: List[Any]|Tuple[Any], keyset2: List[Any]|Tuple[Any]) -> bool:
     '''
@@ -433,37 +591,30 @@ def possible_functional_dependency(table: Table, keyset1: List[Any]|Tuple[Any],
     this will return True because for each studentName entry, the GPA is the same.
     '''
     # Implementation idea:
-    # If we take the length of the set of the first keyset and the combined keyset, and they are the same, 
+    # If the number of distinct values of the first keyset and the combined keyset are the same, 
     # then we can say that the second set values always match the first set values (i.e. the first set key values don't conflict with their second set key values).
-    # In contrast, if the length of the combined keyset > first keyset, then we can say that at least one of the first set keys has conflicting second set keys.
+    # In contrast, if the combined keyset has more distinct values, then we can say that at least one of the first set keys has conflicting second set keys.
     # This checks the following condition:
     #   - For ANY single value of A in the dependency A -> B, exactly one value of B exists.
-    keylist1 = [table.get_key_column(keyset1[i]) for i in range(len(keyset1))]
-    keylist2 = [table.get_key_column(keyset2[i]) for i in range(len(keyset2))]
-    combinedlist = keylist1 + keylist2
-    solezipset = set(zip(*keylist1))
-    combinedzipset = set(zip(*combinedlist))
-    return len(solezipset) == len(combinedzipset)
+    # The check itself is done on the cached stripped partitions of the table (see Table.holds_functional_dependency)
+    search_counters["fd_checks"] += 1
+    return table.holds_functional_dependency(keyset1, keyset2)
 
 def possible_multivalued_dependency(table: Table, keyset1: List[Any]|Tuple[Any], keyset2: List[Any]|Tuple[Any]) -> bool:
     # This checks the following condition:
     #   - The table must contain at least 3 columns.
     if len(table.keys) < 3:
         return False
+    search_counters["mvd_checks"] += 1
     # This checks the following condition:
     #   - For a single value of A in the dependency A -> B, multiple values of B exist.
-    # This code is similar to possible_functional_dependency but with the opposite check condition.
-    keylist1 = [table.get_key_column(keyset1[i]) for i in range(len(keyset1))]
-    keylist2 = [table.get_key_column(keyset2[i]) for i in range(len(keyset2))]
-    combinedlist = keylist1 + keylist2
-    solezipset = set(zip(*keylist1))
-    combinedzipset = set(zip(*combinedlist))
-    if len(solezipset) == len(combinedzipset):
+    # This is the opposite check condition of possible_functional_dependency.
+    if possible_functional_dependency(table, keyset1, keyset2):
         return False
     # This checks the following condition:
     #   - For the table T(A, B, C), if A -> B, then B and C must be independent of each other.
     #   - This is done by checking if there are any possible functional dependencies (B -> C or B <- C).
-    if possible_functional_dependency(table, keyset1, keyset2) or possible_functional_dependency(table, keyset2, keyset1):
+    if possible_functional_dependency(table, keyset2, keyset1):
         return False
     return True
 
@@ -498,18 +649,11 @@ def split_table(table: Table, pkeys: List[Any]|Tuple[Any], nkeys: List[Any]|Tupl
     the same arguments will return True. 
     If this is not the case, the resulting tables may contain anomalies.
 '''
-    tabledatacopy = copy.deepcopy(table.table_data)
     # First table is created by removing the non-primary key columns
-    first_table = Table(tabledatacopy)
-    for key in nkeys:
-        first_table.remove_key_column(key)
-    # Second table is created by retrieving the values of the primary and non-primary key columns,
-    # and creating a new table
+    first_table = table.project([key for key in table.keys if key not in nkeys])
+    # Second table is created from the primary and non-primary key columns
     # The primary and non-primary keys will retain their primary and non-primary attributes
-    pkeylist = [[pkeys[i] + "*"] + table.get_key_column(pkeys[i]) for i in range(len(pkeys))]
-    nkeylist = [[nkeys[i]] + table.get_key_column(nkeys[i]) for i in range(len(nkeys))]
-    # Table transposition is needed to get the correct table structure
-    second_table = Table(util.transpose(pkeylist + nkeylist))
+    second_table = table.project(list(pkeys) + list(nkeys), primary_keys=pkeys)
     return (first_table, second_table)
 
 
@@ -517,19 +661,22 @@ def split_table_4NF(table: Table, keyset1: List[Any]|Tuple[Any], keyset2: List[A
     '''
     Similar to split_table, but both keyset1 and keyset2 will beecome primary keys in the second table.
     '''
-    tabledatacopy = copy.deepcopy(table.table_data)
-    # First table is created by simply removing keyset2 (after deepcopying the original table data)
-    first_table = Table(tabledatacopy)
-    for key in keyset2:
-        first_table.remove_key_column(key)
-    # Second table is created by retrieving the values of the keyset1 and keyset2 columns, and creating a new table
+    # First table is created by simply removing keyset2
+    first_table = table.project([key for key in table.keys if key not in keyset2])
+    # Second table is created from the keyset1 and keyset2 columns
     # However unlike split_table, both keyset1 and keyset2 are primary keys
-    keylist1 = [[keyset1[i] + "*"] + table.get_key_column(keyset1[i]) for i in range(len(keyset1))]
-    keylist2 = [[keyset2[i] + "*"] + table.get_key_column(keyset2[i]) for i in range(len(keyset2))]
-    # Table transposition is needed to get the correct table structure
-    second_table = Table(util.transpose(keylist1 + keylist2))
+    second_table = table.project(list(keyset1) + list(keyset2), primary_keys=list(keyset1) + list(keyset2))
     return (first_table, second_table)
 
+def split_table_4NF_without_anomalies(table: Table, keyset1: List[Any]|Tuple[Any], keyset2: List[Any]|Tuple[Any]) -> Optional[Tuple[Table, Table]]:
+    '''
+    Splits the table using split_table_4NF, but returns None if the split would create data anomalies.
+    '''
+    a, b = split_table_4NF(table, keyset1, keyset2)
+    # Check if no data anomalies are created
+    if no_data_anomalies(table, a, b):
+        return (a, b)
+    return None
 
 def split_table_5NF(table: Table) -> Tuple[Table, Table, Table]:
     '''
@@ -539,18 +686,12 @@ def split_table_5NF(table: Table) -> Tuple[Table, Table, Table]:
     # Table must have 3 columns
     if len(table.keys) != 3:
         return (table, None, None)
-    # First table is created by removing the last column (after deepcopying the original table data)
-    tabledatacopy1 = copy.deepcopy(table.table_data)
-    first_table = Table(tabledatacopy1)
-    first_table.remove_key_column(table.keys[2])
+    # First table is created by removing the last column
+    first_table = table.project([table.keys[0], table.keys[1]])
     # Second table is created by removing the first column
-    tabledatacopy2 = copy.deepcopy(table.table_data)
-    second_table = Table(tabledatacopy2)
-    second_table.remove_key_column(table.keys[0])
+    second_table = table.project([table.keys[1], table.keys[2]])
     # Third table is created by removing the second column
-    tabledatacopy3 = copy.deepcopy(table.table_data)
-    third_table = Table(tabledatacopy3)
-    third_table.remove_key_column(table.keys[1])
+    third_table = table.project([table.keys[0], table.keys[2]])
     return (first_table, second_table, third_table)
 
 def is_lossless_5NF(mainTable: Table, childTables: Tuple[Table, Table, Table]):
@@ -561,37 +702,39 @@ def is_lossless_5NF(mainTable: Table, childTables: Tuple[Table, Table, Table]):
     # Set of all rows in the mainTable
     main_table_rows = set([frozenset(row) for row in mainTable.rows])
     # Find the child table that has the most rows
-    largest_child_table = max(childTables, key=lambda x: len(x.rows))
+    largest_child_table = max(childTables, key=lambda x: x.row_count)
     small_tables = list(set(childTables) - set([largest_child_table]))
     st2, st3 = small_tables
+    # Rows are only decoded once per table (see Table.rows)
+    st2_rows, st3_rows, largest_child_table_rows = st2.rows, st3.rows, largest_child_table.rows
 
     # Build dictionaries for each small table
     dict_st2a = {}
     dict_st2b = {}
     dict_st2 = {}
-    for i in range(len(st2.rows)):
-        if st2.rows[i][0] in dict_st2a:
-            dict_st2a[st2.rows[i][0]].append(st2.rows[i][1])
+    for i in range(len(st2_rows)):
+        if st2_rows[i][0] in dict_st2a:
+            dict_st2a[st2_rows[i][0]].append(st2_rows[i][1])
         else:
-            dict_st2a[st2.rows[i][0]] = [st2.rows[i][1]]
-        if st2.rows[i][1] in dict_st2b:
-            dict_st2b[st2.rows[i][1]].append(st2.rows[i][0])
+            dict_st2a[st2_rows[i][0]] = [st2_rows[i][1]]
+        if st2_rows[i][1] in dict_st2b:
+            dict_st2b[st2_rows[i][1]].append(st2_rows[i][0])
         else:
-            dict_st2b[st2.rows[i][1]] = [st2.rows[i][0]]
+            dict_st2b[st2_rows[i][1]] = [st2_rows[i][0]]
     dict_st2[st2.keys[0]] = dict_st2a
     dict_st2[st2.keys[1]] = dict_st2b
     dict_st3a = {}
     dict_st3b = {}
     dict_st3 = {}
-    for i in range(len(st3.rows)):
-        if st3.rows[i][0] in dict_st3a:
-            dict_st3a[st3.rows[i][0]].append(st3.rows[i][1])
+    for i in range(len(st3_rows)):
+        if st3_rows[i][0] in dict_st3a:
+            dict_st3a[st3_rows[i][0]].append(st3_rows[i][1])
         else:
-            dict_st3a[st3.rows[i][0]] = [st3.rows[i][1]]
-        if st3.rows[i][1] in dict_st3b:
-            dict_st3b[st3.rows[i][1]].append(st3.rows[i][0])
+            dict_st3a[st3_rows[i][0]] = [st3_rows[i][1]]
+        if st3_rows[i][1] in dict_st3b:
+            dict_st3b[st3_rows[i][1]].append(st3_rows[i][0])
         else:
-            dict_st3b[st3.rows[i][1]] = [st3.rows[i][0]]
+            dict_st3b[st3_rows[i][1]] = [st3_rows[i][0]]
     dict_st3[st3.keys[0]] = dict_st3a
     dict_st3[st3.keys[1]] = dict_st3b
 
@@ -607,13 +750,13 @@ def is_lossless_5NF(mainTable: Table, childTables: Tuple[Table, Table, Table]):
         st3_relevant_dict = dict_st3[largest_child_table_keys[0]]
         flag = False
 
-    for i in range(len(largest_child_table.rows)):
+    for i in range(len(largest_child_table_rows)):
         if flag:
-            a = largest_child_table.rows[i][0]
-            b = largest_child_table.rows[i][1]
+            a = largest_child_table_rows[i][0]
+            b = largest_child_table_rows[i][1]
         else:
-            a = largest_child_table.rows[i][1]
-            b = largest_child_table.rows[i][0]
+            a = largest_child_table_rows[i][1]
+            b = largest_child_table_rows[i][0]
         if a in st2_relevant_dict.keys() and b in st3_relevant_dict.keys():
             common_values = set(st2_relevant_dict[a]).intersection(set(st3_relevant_dict[b]))
             for c in common_values:
@@ -627,19 +770,222 @@ def no_data_anomalies(parentTable: Table, childTable1: Table, childTable2: Table
     no data loss or extra data gained when joining the two child tables.
     '''
     # Basic check: check if the combined table has the same number of rows as the parent table
-    if len(childTable1.rows) + len(childTable2.rows) != len(parentTable.rows):
+    if childTable1.row_count + childTable2.row_count != parentTable.row_count:
         return False
     return True
 
+def current_table_only(table: Table) -> List[Table]:
+    '''
+    Given a table, returns a List with only the table itself (i.e. using its current primary keys).
+    '''
+    return [table]
+
 def all_candidate_tables(table: Table) -> List[Table]:
     '''
     Given a table, returns a List of tables using all possible candidate keys of the table.
+    Note: This calculates the candidate keys of the table, which is not limited by a SearchBudget.
     '''
     res = []
     for tup in table.candidate_keys:
-        keys = copy.deepcopy(table.keys)
-        for i in range(len(keys)):
-            if keys[i] in tup:
-                keys[i] = keys[i] + "*"
-        res.append(Table([keys] + table.rows))
+        res.append(table.project(table.keys, primary_keys=tup))
     return res
+
+# The builder of each normal form, in the order they are applied
+NORMAL_FORM_BUILDERS = [("1NF", create_1NF_tables), ("2NF", create_2NF_tables), ("3NF", create_3NF_tables), \
+    ("BCNF", create_BCNF_tables), ("4NF", create_4NF_tables), ("5NF", create_5NF_tables)]
+
+def create_tables_up_to(tables: List[Table], normal_form: str, workers: int = 1, \
+    budget: Optional[SearchBudget] = None) -> List[Table]:
+    '''
+    Runs every normal form builder from 1NF up to and including normal_form (e.g. "BCNF") on the tables.
+    The budget limits all the builders together (see SearchBudget).
+    '''
+    names = [name for name, _ in NORMAL_FORM_BUILDERS]
+    if normal_form not in names:
+        raise ValueError(f"Error: Unknown normal form {normal_form}, expected one of {names}")
+    for _, create_tables in NORMAL_FORM_BUILDERS[:names.index(normal_form) + 1]:
+        tables = create_tables(tables, workers=workers, budget=budget)
+    return tables
+
+def normalise(tables: List[Table], target: str = "BCNF", workers: int = 1, trace_memory: bool = True, \
+    budget: Optional[SearchBudget] = None) -> Tuple[List[Table], dict]:
+    '''
+    Runs every normal form builder from 1NF up to and including target on the tables (like create_tables_up_to),
+    and returns the resulting tables together with a report of the work done by each stage.
+    Each stage is run on each of its input tables separately, so the report has an entry per stage and per input table:
+    {"target": target, "seconds": total wall time, "stages": [{"stage": "1NF", "seconds": ..., "tables": [
+        {"keys": columns of the input table, "output_tables": number of tables created, "seconds": wall time,
+         "peak_memory": peak bytes allocated (None if trace_memory is False), "fd_checks": ..., "mvd_checks": ...,
+         "search_states": ..., "splits_explored": ..., "decompositions_scored": ..., "cache_hits": ...,
+         "exhaustive": False if the budget stopped a search}, ...]}, ...], "exhaustive": ...}
+    The budget limits all the stages together (see SearchBudget).
+    cache_hits counts the dependency lookups answered by the dependency catalogue (see catalogue.py) and by the
+    dependency cache (see resultcache.py).
+    Note: Tracing memory with tracemalloc slows the stages down several times, so set trace_memory to False
+    when only the timings and counts are needed.
+    '''
+    names = [name for name, _ in NORMAL_FORM_BUILDERS]
+    if target not in names:
+        raise ValueError(f"Error: Unknown normal form {target}, expected one of {names}")
+    report = {"target": target, "seconds": 0.0, "stages": []}
+    if budget is not None:
+        budget.start()
+    for name, create_tables in NORMAL_FORM_BUILDERS[:names.index(target) + 1]:
+        results = map_tables(partial(measure_stage, create_tables=create_tables, trace_memory=trace_memory, \
+            budget=budget), tables, workers)
+        tables = util.flattenlist(new_tables for new_tables, _ in results)
+        table_reports = [table_report for _, table_report in results]
+        # Worker processes use copies of the budget, so the work they record is added back to it
+        if budget is not None and uses_worker_processes(results, workers):
+            for table_report in table_reports:
+                budget.nodes_expanded += table_report["search_states"]
+                budget.truncated_searches += not table_report["exhaustive"]
+        stage_seconds = sum(table_report["seconds"] for table_report in table_reports)
+        report["stages"].append({"stage": name, "seconds": stage_seconds, "tables": table_reports})
+        report["seconds"] += stage_seconds
+    report["exhaustive"] = all(table_report["exhaustive"] for stage in report["stages"] for table_report in stage["tables"])
+    return tables, report
+
+def measure_stage(table: Table, create_tables: Callable[..., List[Table]], trace_memory: bool = True, \
+    budget: Optional[SearchBudget] = None) -> Tuple[List[Table], dict]:
+    '''
+    Runs a normal form builder on a single table and returns the tables created, with a report of
+    the work done (see normalise). The counts are taken in the process running the builder.
+    '''
+    counters_before = search_counters.copy()
+    catalogue_hits_before = table.dependency_catalogue.hits
+    cache_hits_before = resultcache.dependency_cache.hits
+    truncated_before = budget.truncated_searches if budget is not None else 0
+    started_tracing = trace_memory and not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+    if trace_memory:
+        tracemalloc.reset_peak()
+    start = time.perf_counter()
+    try:
+        new_tables = create_tables([table], budget=budget)
+        seconds = time.perf_counter() - start
+        peak_memory = tracemalloc.get_traced_memory()[1] if trace_memory else None
+    finally:
+        if started_tracing:
+            tracemalloc.stop()
+    table_report = {"keys": list(table.keys), "output_tables": len(new_tables), "seconds": seconds, "peak_memory": peak_memory}
+    for counter in ("fd_checks", "mvd_checks", "search_states", "splits_explored", "decompositions_scored"):
+        table_report[counter] = search_counters[counter] - counters_before[counter]
+    table_report["cache_hits"] = table.dependency_catalogue.hits - catalogue_hits_before + \
+        resultcache.dependency_cache.hits - cache_hits_before
+    table_report["exhaustive"] = budget is None or budget.truncated_searches == truncated_before
+    return new_tables, table_report
+
+def renormalise(previous_tables: List[List[Table]], tables: List[Table], normal_form: str, \
+    workers: int = 1) -> List[List[Table]]:
+    '''
+    Normalises updated tables up to normal_form, reusing the previous tables of each one wherever they are still valid.
+    previous_tables[i] is the result of normalising an earlier version of tables[i] up to the same normal form,
+    e.g. [create_tables_up_to([table], normal_form) for table in tables], or an earlier result of renormalise.
+    The previous tables of each input table are projected from its new rows, and the decomposition is kept if
+    - every primary key that was unique in a previous table is still unique, i.e. the functional dependencies
+      the splits relied on still hold,
+    - joining the projected tables still gives back exactly the rows of the input table, and
+    - every projected table is still in each normal form up to normal_form, as the new rows can create new
+      dependencies (e.g. by removing rows) or break candidate keys other than the primary key (e.g. by inserting
+      rows), which turns prime attributes into non-prime ones.
+    Only the input tables failing a check (or whose columns changed) are searched again from 1NF.
+    Note: A kept decomposition is valid, but the search may have found a decomposition with a better MML value
+    for the new rows. Use create_tables_up_to to search everything again.
+    Note: Decompositions that do not join back losslessly in the first place (the 4NF and 5NF searches
+    accept some splits by row counts alone) are always searched again.
+    Returns the normalised tables of each input table, in the same order as tables.
+    '''
+    # The previous tables are given per input table, as tables sharing column names cannot be told apart by their columns
+    if len(previous_tables) != len(tables):
+        raise ValueError(f"Error: Expected previous tables for {len(tables)} input table(s), got {len(previous_tables)}")
+    result = [None] * len(tables)
+    to_search = []
+    for index, (table, table_previous_tables) in enumerate(zip(tables, previous_tables)):
+        projected_tables = reuse_decomposition(table, table_previous_tables, normal_form)
+        if projected_tables is None:
+            to_search.append(index)
+        else:
+            result[index] = projected_tables
+    searched_tables = map_tables(partial(create_tables_up_to, normal_form=normal_form), \
+        [[tables[index]] for index in to_search], workers)
+    for index, new_tables in zip(to_search, searched_tables):
+        result[index] = new_tables
+    return result
+
+def reuse_decomposition(table: Table, previous_tables: List[Table], normal_form: str) -> Optional[List[Table]]:
+    '''
+    Projects the tables of a previous decomposition (up to normal_form) from the rows of table, and returns them
+    if the decomposition is still valid (see renormalise), or None otherwise.
+    '''
+    if not previous_tables or set(util.flattenlist(t.keys for t in previous_tables)) != set(table.keys):
+        return None
+    projected_tables = []
+    for previous_table in previous_tables:
+        projected_table = table.project(previous_table.keys, primary_keys=previous_table.primary_keys)
+        # Only the primary keys that were unique before were relied on by the previous search
+        if previous_table.primary_keys and previous_table.uniqueness_violation(previous_table.primary_keys) is None \
+            and projected_table.uniqueness_violation(previous_table.primary_keys) is not None:
+            return None
+        projected_tables.append(projected_table)
+    if len(projected_tables) > 1 and not is_lossless_join(table, projected_tables):
+        return None
+    if not all(is_in_normal_forms_up_to(projected_table, normal_form) for projected_table in projected_tables):
+        return None
+    return projected_tables
+
+# The dependencies that each normal form forbids (see the create_*NF_tables functions)
+NORMAL_FORM_DEPENDENCIES = [("2NF", partial_dependencies), ("3NF", transitive_dependencies), \
+    ("BCNF", prime_attribute_dependencies), ("4NF", illegal_multivalued_dependencies)]
+
+def is_in_normal_forms_up_to(table: Table, normal_form: str) -> bool:
+    '''
+    Returns True if the table has none of the dependencies forbidden by the normal forms up to normal_form,
+    i.e. if the builders up to normal_form would not split it.
+    In 5NF, a table with 3 columns must not decompose losslessly into its 3 projections (see create_5NF_tables).
+    '''
+    names = [name for name, _ in NORMAL_FORM_BUILDERS]
+    for name, find_dependencies in NORMAL_FORM_DEPENDENCIES:
+        if names.index(name) <= names.index(normal_form) and next(find_dependencies(table), None) is not None:
+            return False
+    if normal_form == "5NF" and len(table.keys) == 3 and is_lossless_5NF(table, split_table_5NF(table)):
+        return False
+    return True
+
+def is_lossless_join(table: Table, childTables: List[Table]) -> bool:
+    '''
+    Returns True if joining the childTables gives back exactly the rows of table.
+    The childTables must be projections of table (see Table.project), so their value codes can be compared directly.
+    As projections, their join always contains every row of table, so it is enough to count the joined rows.
+    Note: The join stops as soon as the rows joined so far outnumber the rows of table. This never accepts
+    a lossy decomposition, but may reject a lossless one if the tables are joined in an unlucky order.
+    '''
+    if set(util.flattenlist(t.keys for t in childTables)) != set(table.keys):
+        return False
+    remaining_tables = list(childTables)
+    first_table = remaining_tables.pop(0)
+    joined_keys = list(first_table.keys)
+    joined_rows = list(first_table.column_store.code_rows())
+    while remaining_tables:
+        # The next table joined is the one sharing the most columns with the rows joined so far
+        child = max(remaining_tables, key=lambda t: len(set(t.keys) & set(joined_keys)))
+        remaining_tables.remove(child)
+        shared_keys = [key for key in child.keys if key in joined_keys]
+        new_keys = [key for key in child.keys if key not in joined_keys]
+        shared_indices = [child.keys.index(key) for key in shared_keys]
+        new_indices = [child.keys.index(key) for key in new_keys]
+        # Groups the new columns of the child table by its values in the shared columns
+        matches = {}
+        for row in child.column_store.code_rows():
+            matches.setdefault(tuple(row[i] for i in shared_indices), []).append(tuple(row[i] for i in new_indices))
+        joined_indices = [joined_keys.index(key) for key in shared_keys]
+        new_joined_rows = []
+        for row in joined_rows:
+            for extra in matches.get(tuple(row[i] for i in joined_indices), []):
+                new_joined_rows.append(row + extra)
+            if len(new_joined_rows) > table.row_count:
+                return False
+        joined_keys += new_keys
+        joined_rows = new_joined_rows
+    return len(joined_rows) == table.row_count
@@ -0,0 +1,106 @@
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
+from typing import List, Tuple, Sequence
+from columnstore import ColumnStore, CODE_TYPE
+import util
+
+# Candidate key discovery for wide tables, with each level of the combination lattice split across worker processes.
+# The integer codes of all columns are copied once into a shared memory block that every worker attaches to,
+# so rows are never pickled and sent to the workers.
+
+# Number of combinations sent to a worker at a time
+CHUNK_SIZE = 64
+
+# Tables with fewer values (rows times columns) than this are searched sequentially, as starting the
+# worker processes takes longer than the search itself
+MIN_PARALLEL_CELLS = 20000
+
+# Set in each worker process by _attach_columns
+_shared_memory = None
+_columns = None
+
+def discover_candidate_keys(store: ColumnStore, workers: int) -> List[Tuple[int, ...]]:
+    """
+    Finds the candidate keys of the rows in a column store, testing the combinations of each lattice level in parallel.
+    Gives the same candidate keys in the same order as Table.calculate_candidate_keys.
+    Note: The rows in the store must not contain duplicates.
+
+    Args:
+        store (ColumnStore): The rows to find the candidate keys of.
+        workers (int): The number of worker processes.
+
+    Returns:
+        List[Tuple[int, ...]]: The candidate keys, as tuples of column indices.
+    """
+    row_count, column_count = store.row_count, store.column_count
+    # Every column is unique in a table without rows, and an empty shared memory block cannot hold the codes
+    if row_count == 0:
+        return [(i,) for i in range(column_count)]
+    itemsize = array(CODE_TYPE).itemsize
+    shared_memory = SharedMemory(create=True, size=max(row_count * column_count * itemsize, 1))
+    try:
+        # Columns are stored one after another in the shared memory block
+        view = shared_memory.buf.cast(CODE_TYPE)
+        for col_index, codes in enumerate(store.codes):
+            view[col_index * row_count:(col_index + 1) * row_count] = array(CODE_TYPE, codes)
+        view.release()
+        unique_counts = [store.unique_count(i) for i in range(column_count)]
+        candidate_keys = []
+        with ProcessPoolExecutor(max_workers=workers, initializer=_attach_columns, \
+            initargs=(shared_memory.name, row_count, column_count)) as executor:
+            level = [(i,) for i in range(column_count)]
+            while level:
+                # A combination with fewer possible distinct values than rows cannot be unique,
+                # so only the other combinations are sent to the workers
+                to_test = [comb for comb in level if _max_distinct_values(comb, unique_counts) >= row_count]
+                chunks = [to_test[i:i + CHUNK_SIZE] for i in range(0, len(to_test), CHUNK_SIZE)]
+                unique_combinations = set()
+                for chunk, flags in zip(chunks, executor.map(_unique_flags, chunks)):
+                    unique_combinations.update(comb for comb, is_unique in zip(chunk, flags) if is_unique)
+                non_unique_combinations = []
+                for comb in level:
+                    if comb in unique_combinations:
+                        candidate_keys.append(comb)
+                    else:
+                        non_unique_combinations.append(comb)
+                level = util.next_lattice_level(non_unique_combinations)
+        return candidate_keys
+    finally:
+        shared_memory.close()
+        shared_memory.unlink()
+
+def _max_distinct_values(combination: Tuple[int, ...], unique_counts: Sequence[int]) -> int:
+    """
+    Returns the maximum number of distinct values a combination of columns can have.
+    """
+    total = 1
+    for i in combination:
+        total *= unique_counts[i]
+    return total
+
+def _attach_columns(name: str, row_count: int, column_count: int) -> None:
+    """
+    Worker process initialiser that attaches to the shared memory block holding the column codes.
+    """
+    global _shared_memory, _columns
+    # The parent process owns the block and unlinks it once the workers are done
+    _shared_memory = SharedMemory(name=name)
+    view = _shared_memory.buf.cast(CODE_TYPE)
+    _columns = [view[i * row_count:(i + 1) * row_count] for i in range(column_count)]
+
+def _unique_flags(combinations: List[Tuple[int, ...]]) -> List[bool]:
+    """
+    Worker function that checks whether each combination of column indices is unique.
+    """
+    flags = []
+    for comb in combinations:
+        seen = set()
+        for subset in zip(*[_columns[i] for i in comb]):
+            if subset in seen:
+                flags.append(False)
+                break
+            seen.add(subset)
+        else:
+            flags.append(True)
+    return flags
@@ -0,0 +1,68 @@
+from array import array
+from typing import List, Any, Sequence
+
+# A stripped partition groups the row indices of a table by their values on a set of columns,
+# keeping only the equivalence classes that contain more than one row.
+# e.g. for the column ["a", "b", "a", "c", "b"] the stripped partition is [[0, 2], [1, 4]]
+# A column combination is unique exactly when its stripped partition is empty.
+# Classes are stored as compact integer arrays rather than lists, as partitions are cached for many combinations.
+
+def column_partition(column: Sequence[Any]) -> List[Sequence[int]]:
+    """
+    Builds the stripped partition of a single column.
+
+    Args:
+        column (Sequence[Any]): The values of the column, one per row.
+
+    Returns:
+        List[Sequence[int]]: The equivalence classes (as lists of row indices) with more than one row.
+    """
+    classes = {}
+    for row_index, value in enumerate(column):
+        if value in classes:
+            classes[value].append(row_index)
+        else:
+            classes[value] = [row_index]
+    return [array('i', c) for c in classes.values() if len(c) > 1]
+
+def partition_product(partition1: List[Sequence[int]], partition2: List[Sequence[int]]) -> List[Sequence[int]]:
+    """
+    Calculates the stripped partition of the union of two column sets from their stripped partitions.
+    Two rows are in the same resulting class only if they share a class in both partitions.
+
+    Args:
+        partition1 (List[Sequence[int]]): The stripped partition of the first column set.
+        partition2 (List[Sequence[int]]): The stripped partition of the second column set.
+
+    Returns:
+        List[Sequence[int]]: The stripped partition of the combined column set.
+    """
+    if not partition1 or not partition2:
+        return []
+    # Maps each row index to the class it belongs to in the first partition
+    class_of_row = {}
+    for class_index, c in enumerate(partition1):
+        class_of_row.update(dict.fromkeys(c, class_index))
+    product = []
+    for c in partition2:
+        groups = {}
+        for row_index in c:
+            class_index = class_of_row.get(row_index)
+            if class_index is not None:
+                groups.setdefault(class_index, []).append(row_index)
+        product.extend(array('i', g) for g in groups.values() if len(g) > 1)
+    return product
+
+def partition_error(partition: List[Sequence[int]]) -> int:
+    """
+    Calculates the error of a stripped partition, i.e. the minimum number of rows that would 
+    have to be removed for the column set to become unique.
+    For a table with n rows, the number of distinct values of the column set is n - error.
+
+    Args:
+        partition (List[Sequence[int]]): A stripped partition.
+
+    Returns:
+        int: The error of the partition.
+    """
+    return sum(len(c) for c in partition) - len(partition)
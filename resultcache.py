@@ -0,0 +1,121 @@
+from collections import OrderedDict
+from typing import Any, Dict, Hashable
+
+# Default maximum number of results held by the dependency cache
+DEFAULT_MAXSIZE = 100000
+
+class LRUCache:
+    """
+    A least recently used cache with a size limit and hit/miss statistics.
+
+    Attributes:
+        maxsize (int): The maximum number of entries. A maxsize of 0 disables the cache.
+        hits (int): The number of lookups that found a result.
+        misses (int): The number of lookups that did not find a result.
+    """
+
+    def __init__(self, maxsize: int = DEFAULT_MAXSIZE):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Looks up a result, marking it as the most recently used.
+
+        Args:
+            key (Hashable): The key of the result.
+            default (Any): The value returned if there is no result for the key.
+
+        Returns:
+            Any: The cached result, or default if there is none.
+        """
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return self._entries[key]
+        self.misses += 1
+        return default
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """
+        Stores a result, evicting the least recently used results if the cache is full.
+
+        Args:
+            key (Hashable): The key of the result.
+            value (Any): The result.
+
+        Returns:
+            None
+        """
+        if self.maxsize <= 0:
+            return
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def resize(self, maxsize: int) -> None:
+        """
+        Changes the size limit of the cache, evicting results if needed.
+
+        Args:
+            maxsize (int): The new maximum number of entries.
+
+        Returns:
+            None
+        """
+        self.maxsize = maxsize
+        while len(self._entries) > max(maxsize, 0):
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """
+        Removes all results and resets the statistics.
+
+        Returns:
+            None
+        """
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Returns the hit/miss statistics and size of the cache.
+        """
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._entries), "maxsize": self.maxsize}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# Process-wide cache of uniqueness, functional dependency and candidate key results.
+# Results are keyed by the fingerprints of the columns involved (see Table._column_fingerprint),
+# so tables holding identical column data share their results.
+dependency_cache = LRUCache()
+
+def configure(maxsize: int) -> None:
+    """
+    Sets the maximum number of results held by the dependency cache. A maxsize of 0 disables it.
+
+    Args:
+        maxsize (int): The maximum number of results.
+
+    Returns:
+        None
+    """
+    dependency_cache.resize(maxsize)
+
+def stats() -> Dict[str, int]:
+    """
+    Returns the hit/miss statistics and size of the dependency cache.
+    """
+    return dependency_cache.stats()
+
+def clear() -> None:
+    """
+    Removes all results from the dependency cache and resets its statistics.
+    """
+    dependency_cache.clear()
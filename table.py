@@ -1,13 +1,32 @@
 from __future__ import annotations
-from itertools import combinations
-from typing import List, Tuple, Any
-from copy import deepcopy
+from bisect import bisect_left, insort
+from itertools import combinations, islice
+from typing import List, Tuple, Any, Sequence, Optional, Dict, Set
+from collections import Counter
+from functools import cached_property
+import hashlib
+import random
+from array import array
+from columnstore import ColumnStore, CODE_TYPE
+from attributeset import AttributeSet
+from catalogue import DependencyCatalogue
 import codetotable as mml
+import parallelkeys
+import partitions
+import resultcache
 import util
 
+# Seed for choosing the sample rows, so the same table always gives the same sample
+SAMPLE_SEED = 0
+# Up to this many rows are deleted from private code arrays in place (one memmove per row and column),
+# more rows are deleted by compacting the arrays into new ones
+IN_PLACE_DELETE_LIMIT = 64
+
 class Table:
     """
     Represents a table/relation in a database.
+    Duplicate row removal, unique counts, candidate keys, prime attributes and non-prime attributes
+    are only calculated when they are first accessed, and are cached until the table changes.
 
     Attributes:
         table_data (List[List[Any]]): The data of the table.
@@ -17,28 +36,286 @@ class Table:
         non_primary_keys (List[str]): The non-primary keys of the table.
         primary_key_count (int): The number of primary keys in the table.
         rows (List[List[Any]]): The rows of data in the table.
+        row_count (int): The number of rows in the table.
+        columnar (bool): If True, the rows are only stored in the dictionary-encoded column store.
+        key_discovery_workers (int): If more than 1, candidate keys of tables with at least parallelkeys.MIN_PARALLEL_CELLS
+            values are calculated in parallel by that many processes.
+        sample_size (Optional[int]): If set, candidate keys and functional dependencies are first checked on a sample 
+            of this many rows, and only the ones that hold on the sample are verified on all rows (see _sample).
+        sampling_stats (dict): The number of key and functional dependency checks, and how many were rejected by the sample.
         unique_counts (List[int]): The number of unique instances for each column.
+        data_message_length (float): The length of the data of the table in #A.
         candidate_keys (List[Tuple[str, ...]]): The candidate keys of the table.
+        candidate_key_sets (List[AttributeSet]): The candidate keys of the table as attribute sets.
+        dependency_catalogue (DependencyCatalogue): The dependencies found in the table, shared with the tables projected from it.
         prime_attributes (List[str]): The prime attributes of the table.
         non_prime_attributes (List[str]): The non-prime attributes of the table.
     """
 
-    def __init__(self, table_data: List[List[Any]]):
-        self.table_data = table_data
-        self.keys = util.remove_asterisks(table_data[0])
+    def __init__(self, table_data: List[List[Any]], columnar: bool = False):
+        # The rows are always dictionary-encoded into a column store, which all checks run against.
+        # Unless columnar is True, the decoded rows are also kept as lists once they have been accessed.
+        self._initialise(table_data[0], ColumnStore.from_rows(table_data[1:], len(table_data[0])), columnar)
+
+    def __getstate__(self) -> dict:
+        # Partitions and decoded rows can be rebuilt from the column store, so they are not pickled
+        # (e.g. when tables are sent to worker processes)
+        state = self.__dict__.copy()
+        state["_partition_cache"] = {}
+        state["_rows"] = None
+        state.pop("_sample", None)
+        return state
+
+    @classmethod
+    def from_column_store(cls, header: List[str], store: ColumnStore, columnar: bool = True, \
+        rows_are_unique: bool = False) -> Table:
+        """
+        Creates a Table directly from a column store, without building the rows as lists.
+
+        Args:
+            header (List[str]): The column names, with primary keys marked by an asterisk (*).
+            store (ColumnStore): The dictionary-encoded rows of the table.
+            columnar (bool): If True, the rows are only stored in the column store.
+            rows_are_unique (bool): If True, the store is known to have no duplicate rows,
+                so duplicate row removal is skipped.
+
+        Returns:
+            Table: The new table.
+        """
+        table = cls.__new__(cls)
+        table._initialise(header, store, columnar)
+        if rows_are_unique:
+            table._store = store
+        return table
+
+    def _initialise(self, header: List[str], store: ColumnStore, columnar: bool) -> None:
+        """
+        Sets up the table from its header and column store. Shared by all ways of creating a Table.
+        """
+        self.columnar = columnar
+        self.key_discovery_workers = 1
+        self._sample_size = None
+        self.sampling_stats = {"key_checks": 0, "keys_rejected_by_sample": 0, \
+            "fd_checks": 0, "fds_rejected_by_sample": 0}
+        self._header = list(header)
+        # The rows as given, which may contain duplicates (see _store)
+        self._source_store = store
+        self._rows = None
+        self.keys = util.remove_asterisks(header)
         self.key_count = len(self.keys)
         # Primary keys are indicated with an asterisk (*) at the end of the key name upon initialisation
         # However, asterisks are removed from all key lists after initialisation (EXCEPT in table_data[0])
-        self.primary_keys = util.remove_asterisks([key for key in table_data[0] if key[-1] == "*"])
-        self.non_primary_keys = [key for key in table_data[0] if key[-1] != "*"]
+        self.primary_keys = util.remove_asterisks([key for key in header if key[-1] == "*"])
+        self.non_primary_keys = [key for key in header if key[-1] != "*"]
         self.primary_key_count = len(self.primary_keys)
-        self.rows = table_data[1:]
-        # Important: Automatically removes duplicate rows upon initialisation
+        # Stripped partitions of column index combinations, see partitions.py
+        self._partition_cache = {}
+        # Fingerprints of the column values, see _column_fingerprint
+        self._fingerprints = {}
+        # True if no other store or table shares the code arrays and dictionaries of _store,
+        # so insert_rows can append to them in place (see _private_store)
+        self._owns_store = False
+        # Ids of the rows deleted since _row_positions was built, in ascending order (see _row_index)
+        self._removed_row_ids = []
+
+    @cached_property
+    def _store(self) -> ColumnStore:
+        """
+        The column store of the table.
+        Important: Duplicate rows are automatically removed the first time the rows are used.
+        """
         self.remove_duplicate_rows()
-        self.unique_counts = self._count_unique_instances_per_column()
-        self.candidate_keys = self.calculate_candidate_keys()
-        self.prime_attributes = self.calculate_prime_attributes()
-        self.non_prime_attributes = self.calculate_non_prime_attributes()
+        return self._source_store
+
+    @property
+    def sample_size(self) -> Optional[int]:
+        return self._sample_size
+
+    @sample_size.setter
+    def sample_size(self, sample_size: Optional[int]) -> None:
+        # The sample is drawn again the next time it is used
+        self._sample_size = sample_size
+        self.__dict__.pop("_sample", None)
+
+    @cached_property
+    def _sample(self) -> Optional[Table]:
+        """
+        A table of sample_size randomly chosen rows of this table, or None if sampling is off
+        or the table has no more rows than the sample size.
+        The rows of the sample are a subset of the rows of the table, so a combination that is not unique in
+        the sample is not unique in the table, and a functional dependency that does not hold in the sample
+        does not hold in the table. Only the other checks have to be run on all rows.
+        """
+        if self.sample_size is None or self.row_count <= self.sample_size:
+            return None
+        row_indices = sorted(random.Random(SAMPLE_SEED).sample(range(self.row_count), self.sample_size))
+        return Table.from_column_store(self._header, self._store.take(row_indices), rows_are_unique=True)
+
+    @property
+    def column_store(self) -> ColumnStore:
+        """
+        The dictionary-encoded rows of the table, with duplicate rows removed.
+        """
+        # The caller may keep the store, so it must not be changed in place anymore
+        self._owns_store = False
+        return self._store
+
+    @cached_property
+    def unique_counts(self) -> List[int]:
+        return self._count_unique_instances_per_column()
+
+    @cached_property
+    def data_message_length(self) -> float:
+        """
+        The length of the data of the table in #A, i.e. its contribution to the #A part of any table combination
+        it is part of (see codetotable.table_A).
+        """
+        return mml.table_A(self.row_count, self.unique_counts)
+
+    @cached_property
+    def candidate_keys(self) -> List[Tuple[str, ...]]:
+        return self.calculate_candidate_keys()
+
+    @cached_property
+    def candidate_key_sets(self) -> List[AttributeSet]:
+        return [self.attribute_set(key) for key in self.candidate_keys]
+
+    @cached_property
+    def dependency_catalogue(self) -> DependencyCatalogue:
+        return DependencyCatalogue(self.keys)
+
+    @cached_property
+    def _key_bits(self) -> Dict[str, int]:
+        """
+        Maps each column name to its bit in an AttributeSet mask.
+        """
+        return {key: 1 << i for i, key in enumerate(self.keys)}
+
+    @cached_property
+    def _key_names(self) -> Tuple[str, ...]:
+        """
+        The column names, shared by all AttributeSets of the table.
+        """
+        return tuple(self.keys)
+
+    @cached_property
+    def prime_attributes(self) -> List[str]:
+        return self.calculate_prime_attributes()
+
+    @cached_property
+    def non_prime_attributes(self) -> List[str]:
+        return self.calculate_non_prime_attributes()
+
+    # Indexes kept up to date by insert_rows and delete_rows, built the first time the table is updated
+
+    @cached_property
+    def _row_positions(self) -> Dict[Tuple[int, ...], int]:
+        """
+        Maps the codes of each row to its row id, to find duplicate and deleted rows.
+        Row ids are the row indices at the time the map is built, and inserted rows get the next unused id,
+        so ids stay in row order. Deleted rows are recorded in _removed_row_ids instead of renumbering
+        the rows after them (see _row_index).
+        """
+        self._removed_row_ids = []
+        return {code_row: row_index for row_index, code_row in enumerate(self._store.code_rows())}
+
+    @cached_property
+    def _value_lookups(self) -> List[Dict[Any, int]]:
+        """
+        Maps each value to its code, per column, to encode inserted and deleted rows.
+        Kept up to date by insert_rows, so it is only built once.
+        """
+        return [{value: code for code, value in enumerate(dictionary)} for dictionary in self._store.dictionaries]
+
+    @cached_property
+    def _value_counts(self) -> List[Counter]:
+        """
+        The number of rows holding each value code, per column, to update the unique counts.
+        """
+        return [Counter(codes) for codes in self._store.codes]
+
+    @cached_property
+    def _key_values(self) -> Dict[Tuple[int, ...], Set[Tuple[int, ...]]]:
+        """
+        The codes of each candidate key (as column indices) in every row, to check inserted rows against.
+        Filled in for each key when it is first checked.
+        """
+        return {}
+
+    def invalidate_cache(self) -> None:
+        """
+        Clears all cached attributes of the table, so they are calculated again when next accessed.
+        Must be called whenever the rows or columns of the table change.
+
+        Returns:
+            None
+        """
+        for attribute in ("_store", "_sample", "unique_counts", "data_message_length", "candidate_keys", "candidate_key_sets", \
+            "prime_attributes", "non_prime_attributes", "_key_bits", "_key_names", "_row_positions", "_value_counts", "_key_values", \
+            "_value_lookups"):
+            self.__dict__.pop(attribute, None)
+        self._rows = None
+        self._partition_cache = {}
+        self._fingerprints = {}
+        self._owns_store = False
+
+    @property
+    def rows(self) -> List[List[Any]]:
+        """
+        The rows of the table, decoded from the column store.
+        Note: In columnar mode, the rows are decoded again on every access.
+        """
+        if self._rows is not None:
+            return self._rows
+        rows = self._store.to_rows()
+        if not self.columnar:
+            self._rows = rows
+        return rows
+
+    @property
+    def row_count(self) -> int:
+        """
+        The number of rows in the table. Use this instead of len(rows), which decodes the rows in columnar mode.
+        """
+        return self._store.row_count
+
+    @property
+    def header(self) -> List[str]:
+        """
+        The column names, with primary keys marked by an asterisk (*), as in the Table constructor.
+        Unlike table_data, this does not decode the rows.
+        """
+        return list(self._header)
+
+    @property
+    def table_data(self) -> List[List[Any]]:
+        """
+        The header (with primary keys marked by an asterisk) followed by the rows of the table.
+        """
+        return [self.header] + self.rows
+
+    def attribute_set(self, keys: List[str]|Tuple[str, ...]) -> AttributeSet:
+        """
+        Returns a set of key columns of the table as an AttributeSet, a bitmask over the column indices.
+        e.g. for the keys ["studentNo", "studentName", "GPA"], attribute_set(["GPA", "studentNo"]) has the mask 0b101
+
+        Args:
+            keys (List[str]|Tuple[str, ...]): The key columns (by name).
+
+        Returns:
+            AttributeSet: The set of the key columns.
+
+        Raises:
+            ValueError: If a key is not a column of the table.
+        """
+        key_bits = self._key_bits
+        mask = 0
+        for key in keys:
+            try:
+                mask |= key_bits[key]
+            except KeyError:
+                raise ValueError(f"Error: {key} is not a key of the table") from None
+        return AttributeSet(mask, self._key_names)
 
     def get_key_column(self, key: str) -> List[Any]:
         """
@@ -50,8 +327,36 @@ class Table:
         Returns:
             List[Any]: A list of values from the specified key column.
         """
-        key_index = self.keys.index(key)
-        return [row[key_index] for row in self.rows]
+        return self._store.column(self.keys.index(key))
+
+    def project(self, keys: List[str]|Tuple[str, ...], primary_keys: Optional[List[str]|Tuple[str, ...]] = None) -> Table:
+        """
+        Returns a new Table object with only the given key columns (in the given order), with duplicate rows removed.
+        The new table shares the column storage of this table, so no data is copied, and its attributes
+        are only calculated once.
+        e.g. project(["studentName", "GPA"], primary_keys=["studentName"]) returns a table with the columns
+        "studentName*" and "GPA".
+
+        Args:
+            keys (List[str]|Tuple[str, ...]): The key columns (by name) of the new table.
+            primary_keys (Optional[List[str]|Tuple[str, ...]]): The primary keys of the new table.
+                If None, the key columns keep the primary keys they have in this table.
+
+        Returns:
+            Table: The projected table.
+        """
+        if primary_keys is None:
+            primary_keys = self.primary_keys
+        header = [key + "*" if key in primary_keys else key for key in keys]
+        store = self._store.project([self.keys.index(key) for key in keys])
+        table = Table.from_column_store(header, store, self.columnar, rows_are_unique=self._keeps_rows_unique(keys))
+        # The projection shares the code arrays and dictionaries of this table
+        self._owns_store = False
+        table.sample_size = self.sample_size
+        table.key_discovery_workers = self.key_discovery_workers
+        # Dependencies hold in a projection exactly when they hold in this table, so the catalogue is shared
+        table.dependency_catalogue = self.dependency_catalogue
+        return table
 
     def remove_key_column(self, key: str) -> None:
         """
@@ -65,24 +370,22 @@ class Table:
             None
         """
         key_index = self.keys.index(key)
-        for row in self.rows:
-            del row[key_index]
+        rows_are_unique = self._keeps_rows_unique([k for k in self.keys if k != key])
+        self._source_store = self._store.project([i for i in range(self.key_count) if i != key_index])
         self.keys.remove(key)
         if key in self.primary_keys:
             self.primary_keys.remove(key)
             self.primary_key_count -= 1
         if key in self.non_primary_keys:
             self.non_primary_keys.remove(key)
-        if key in self.table_data[0]:
-            self.table_data[0].remove(key)
-        elif key + "*" in self.table_data[0]:
-            self.table_data[0].remove(key + "*")
+        if key in self._header:
+            self._header.remove(key)
+        elif key + "*" in self._header:
+            self._header.remove(key + "*")
         self.key_count -= 1
-        self.remove_duplicate_rows()
-        self.unique_counts = self._count_unique_instances_per_column()
-        self.candidate_keys = self.calculate_candidate_keys()
-        self.prime_attributes = self.calculate_prime_attributes()
-        self.non_prime_attributes = self.calculate_non_prime_attributes()
+        self.invalidate_cache()
+        if rows_are_unique:
+            self._store = self._source_store
 
     def remove_duplicate_rows(self) -> None:
         """
@@ -92,8 +395,216 @@ class Table:
         Returns:
             None
         """
-        self.rows = [list(t) for t in set(tuple(row) for row in self.rows)]
-        self.table_data = [self.table_data[0]] + self.rows
+        store = self._source_store
+        # Each row is identified by a single integer computed from its codes (see ColumnStore.combination_keys),
+        # so rows are hashed once and no tuple is built per row
+        row_keys = list(store.combination_keys(range(store.column_count)))
+        # Rows are inserted in reverse, so each key keeps the index of its first occurrence
+        first_row_of = dict(zip(reversed(row_keys), range(store.row_count - 1, -1, -1)))
+        if len(first_row_of) < store.row_count:
+            # The first occurrence of each row is kept, in the original row order
+            self._source_store = store.take(sorted(first_row_of.values()))
+            # Row indices have changed, so everything calculated from the rows is invalid
+            self.invalidate_cache()
+
+    def _keeps_rows_unique(self, keys: List[str]|Tuple[str, ...]) -> bool:
+        """
+        Checks if a projection onto the given key columns is known to have no duplicate rows, i.e. if the
+        columns contain a candidate key of the table, so duplicate row removal can be skipped for it.
+        Candidate keys are not calculated for this, so it returns False if they have not been calculated yet.
+
+        Args:
+            keys (List[str]|Tuple[str, ...]): The key columns (by name) of the projection.
+
+        Returns:
+            bool: True if the projection has no duplicate rows, False if it may have some.
+        """
+        if "candidate_key_sets" not in self.__dict__ and "candidate_keys" not in self.__dict__:
+            return False
+        projected_set = self.attribute_set(keys)
+        return any(candidate_key_set.issubset(projected_set) for candidate_key_set in self.candidate_key_sets)
+
+    def insert_rows(self, rows: List[List[Any]]) -> int:
+        """
+        Adds rows to the table, updating its cached attributes from the new rows only.
+        Rows already in the table (or repeated in rows) are skipped, as duplicates are never kept.
+        Inserted rows cannot make a non-unique column combination unique, so the candidate keys only change if
+        an inserted row repeats the values of an existing key, and only the keys are checked against the new rows.
+        Note: The code arrays and dictionaries are appended to in place. They are copied first (once, in C) if they
+        are shared with another store, e.g. after the table was projected or its column_store was accessed.
+        The value lookups, row positions and value counts are kept between calls, and are only built (over all rows)
+        by the first call.
+
+        Args:
+            rows (List[List[Any]]): The rows to insert, with one value per column.
+
+        Returns:
+            int: The number of rows inserted.
+
+        Raises:
+            ValueError: If a row has a different number of values than the table has columns.
+        """
+        for row in rows:
+            if len(row) != self.key_count:
+                raise ValueError(f"Error: Row {row} has {len(row)} values, expected {self.key_count}")
+        positions = self._row_positions
+        value_counts = self._value_counts
+        lookups = self._value_lookups
+        store = self._private_store()
+        next_row_id = store.row_count + len(self._removed_row_ids)
+        inserted = []
+        for row in rows:
+            codes = []
+            for col_index, value in enumerate(row):
+                code = lookups[col_index].get(value)
+                if code is None:
+                    code = len(store.dictionaries[col_index])
+                    lookups[col_index][value] = code
+                    store.dictionaries[col_index].append(value)
+                codes.append(code)
+            codes = tuple(codes)
+            if codes in positions:
+                continue
+            positions[codes] = next_row_id + len(inserted)
+            inserted.append(codes)
+            for col_index, code in enumerate(codes):
+                store.codes[col_index].append(code)
+                value_counts[col_index][code] += 1
+        if not inserted:
+            return 0
+        if "candidate_keys" in self.__dict__ and not self._keys_still_unique(inserted):
+            for attribute in ("candidate_keys", "candidate_key_sets", "prime_attributes", "non_prime_attributes", "_key_values"):
+                self.__dict__.pop(attribute, None)
+        if self._rows is not None:
+            self._rows.extend([store.dictionaries[i][code] for i, code in enumerate(codes)] for codes in inserted)
+        self._replace_store(ColumnStore(store.codes, store.dictionaries, store.row_count + len(inserted)))
+        return len(inserted)
+
+    def _private_store(self) -> ColumnStore:
+        """
+        Returns the column store of the table, first copying its code arrays and dictionaries
+        if they may be shared with another store, so they can be changed in place.
+        """
+        if not self._owns_store:
+            store = self._store
+            self._store = ColumnStore([array(CODE_TYPE, codes) for codes in store.codes], \
+                [list(dictionary) for dictionary in store.dictionaries], store.row_count)
+            self._source_store = self._store
+            self._owns_store = True
+        return self._store
+
+    def _keys_still_unique(self, inserted: List[Tuple[int, ...]]) -> bool:
+        """
+        Checks if every candidate key of the table is still unique after inserting rows, 
+        by looking up the key values of each inserted row.
+        Called after the inserted codes are appended to the code arrays, but before the store is replaced,
+        so the rows of the table before the insert are the first row_count rows of the store.
+
+        Args:
+            inserted (List[Tuple[int, ...]]): The codes of the inserted rows.
+
+        Returns:
+            bool: True if all candidate keys are still unique, False otherwise.
+        """
+        for key in self.candidate_keys:
+            combination = tuple(self.keys.index(k) for k in key)
+            if combination not in self._key_values:
+                self._key_values[combination] = set(islice(zip(*[self._store.codes[i] for i in combination]), \
+                    self._store.row_count))
+            seen = self._key_values[combination]
+            for codes in inserted:
+                subset = tuple(codes[i] for i in combination)
+                if subset in seen:
+                    return False
+                seen.add(subset)
+        return True
+
+    def delete_rows(self, rows: List[List[Any]]) -> int:
+        """
+        Removes rows from the table, keeping the order of the other rows, and updates the unique counts from
+        the removed rows only. Rows that are not in the table are ignored.
+        Removing rows can make a column combination unique, so the candidate keys (and the attributes based on them)
+        are calculated again when next accessed.
+        Note: The Python-level work is proportional to the number of deleted rows. The codes after each deleted row
+        are still moved (in C), so the time also grows slowly with the number of rows. Up to IN_PLACE_DELETE_LIMIT rows
+        are deleted in place from private code arrays (see insert_rows), more rows or shared arrays are compacted
+        into new arrays.
+
+        Args:
+            rows (List[List[Any]]): The rows to delete, with one value per column.
+
+        Returns:
+            int: The number of rows deleted.
+
+        Raises:
+            ValueError: If a row has a different number of values than the table has columns.
+        """
+        for row in rows:
+            if len(row) != self.key_count:
+                raise ValueError(f"Error: Row {row} has {len(row)} values, expected {self.key_count}")
+        positions = self._row_positions
+        value_counts = self._value_counts
+        lookups = self._value_lookups
+        deleted_ids = []
+        for row in rows:
+            codes = tuple(lookup.get(value) for lookup, value in zip(lookups, row))
+            row_id = positions.pop(codes, None)
+            if row_id is None:
+                continue
+            deleted_ids.append(row_id)
+            for col_index, code in enumerate(codes):
+                value_counts[col_index][code] -= 1
+                if value_counts[col_index][code] == 0:
+                    del value_counts[col_index][code]
+        if not deleted_ids:
+            return 0
+        # The row indices in the current store, before any of the rows are removed
+        deleted = [self._row_index(row_id) for row_id in deleted_ids]
+        for row_id in deleted_ids:
+            insort(self._removed_row_ids, row_id)
+        for attribute in ("candidate_keys", "candidate_key_sets", "prime_attributes", "non_prime_attributes", "_key_values"):
+            self.__dict__.pop(attribute, None)
+        if self._rows is not None:
+            for row_index in sorted(deleted, reverse=True):
+                del self._rows[row_index]
+        # Once more rows have been deleted than remain, the positions are rebuilt to keep the removed ids short
+        if len(self._removed_row_ids) > self.row_count:
+            self.__dict__.pop("_row_positions", None)
+        if self._owns_store and len(deleted) <= IN_PLACE_DELETE_LIMIT:
+            store = self._store
+            for row_index in sorted(deleted, reverse=True):
+                for codes in store.codes:
+                    del codes[row_index]
+            self._replace_store(ColumnStore(store.codes, store.dictionaries, store.row_count - len(deleted)))
+        else:
+            # The compacted arrays are new, so the store stays private if the dictionaries were
+            self._replace_store(self._store.delete(deleted), owns_store=self._owns_store)
+        return len(deleted)
+
+    def _row_index(self, row_id: int) -> int:
+        """
+        Returns the current row index of a row id from _row_positions, i.e. the row id less the number of
+        rows deleted before it.
+        """
+        return row_id - bisect_left(self._removed_row_ids, row_id)
+
+    def _replace_store(self, store: ColumnStore, owns_store: bool = True) -> None:
+        """
+        Replaces the rows of the table after insert_rows or delete_rows, which have already updated the attributes
+        they keep. The unique counts are taken from the value counts, and the sample, partitions
+        and fingerprints are cleared, as they depend on the row indices or column values.
+        """
+        self._source_store = store
+        self._store = store
+        self._owns_store = owns_store
+        if "unique_counts" in self.__dict__:
+            self.unique_counts = [len(counts) for counts in self._value_counts]
+        self.__dict__.pop("data_message_length", None)
+        # The catalogue may be shared with projections of the old rows, so the table starts a new one
+        for attribute in ("_sample", "dependency_catalogue"):
+            self.__dict__.pop(attribute, None)
+        self._partition_cache = {}
+        self._fingerprints = {}
 
     def _count_unique_instances_per_column(self) -> List[int]:
         """
@@ -102,12 +613,7 @@ class Table:
         Returns:
             A list of integers representing the number of unique instances per column.
         """
-        unique_counts = []
-        for col_index in range(len(self.keys)):
-            # set() removes duplicates
-            unique_values = set(row[col_index] for row in self.rows)
-            unique_counts.append(len(unique_values))
-        return unique_counts
+        return [self._store.unique_count(col_index) for col_index in range(len(self.keys))]
 
     def _is_unique_combination(self, combination: Tuple[int, ...]) -> bool:
         """
@@ -119,17 +625,288 @@ class Table:
         Returns:
             bool: True if the combination is unique in the table, False otherwise.
         """
-        seen = set()
-        for row in self.rows:
-            # subset is the values in the row at the specified indices
-            # e.g. row = (1, "Alice", 30, "New York"), combination = (0, 1, 2)
-            # subset = (1, "Alice", 30)
-            subset = tuple(row[i] for i in combination)
-            if subset in seen:
+        # The result only depends on the data in the columns, so it is shared between tables (see resultcache.py)
+        cache_key = ("unique", tuple(self._column_fingerprint(i) for i in combination))
+        is_unique = resultcache.dependency_cache.get(cache_key)
+        if is_unique is None:
+            is_unique = self._scan_unique_combination(combination)
+            resultcache.dependency_cache.put(cache_key, is_unique)
+        return is_unique
+
+    def _scan_unique_combination(self, combination: Tuple[int, ...]) -> bool:
+        """
+        Checks if a combination of column indices in a row is unique by scanning the rows.
+        Use _is_unique_combination instead, which caches the result.
+
+        Args:
+            combination (Tuple[int, ...]): A tuple of column indices.
+
+        Returns:
+            bool: True if the combination is unique in the table, False otherwise.
+        """
+        return self._find_duplicate_rows(combination) is None
+
+    def _find_duplicate_rows(self, combination: Tuple[int, ...]) -> Optional[Tuple[int, int]]:
+        """
+        Scans the rows for the first pair of rows with the same values in a combination of columns,
+        stopping as soon as one is found.
+
+        Args:
+            combination (Tuple[int, ...]): A tuple of column indices.
+
+        Returns:
+            Optional[Tuple[int, int]]: The indices of the two rows, or None if the combination is unique.
+        """
+        # Each row is identified by a single integer rather than a tuple of its values (see ColumnStore.combination_keys)
+        first_row_of = {}
+        for row_index, key in enumerate(self._store.combination_keys(combination)):
+            if key in first_row_of:
+                return first_row_of[key], row_index
+            first_row_of[key] = row_index
+        return None
+
+    def uniqueness_violation(self, keys: List[str]|Tuple[str, ...]) -> Optional[Tuple[int, int, Tuple[Any, ...], Tuple[Any, ...]]]:
+        """
+        Finds a witness that a combination of keys is not unique: the first pair of rows with the same values in the keys.
+        e.g. (0, 3, ("Alice", 30), ("Alice", 30)) if rows 0 and 3 both have the name "Alice" and the age 30
+
+        Args:
+            keys (List[str]|Tuple[str, ...]): The key columns (by name).
+
+        Returns:
+            Optional[Tuple[int, int, Tuple[Any, ...], Tuple[Any, ...]]]: The indices of the two rows (in rows) and their
+            values in the keys, or None if the combination is unique.
+        """
+        combination = tuple(self.keys.index(key) for key in keys)
+        row_pair = self._find_duplicate_rows(combination)
+        if row_pair is None:
+            return None
+        return self._witness(row_pair, combination)
+
+    def _column_fingerprint(self, col_index: int) -> Tuple[int, int, bytes]:
+        """
+        Returns a fingerprint of which rows of a column hold equal values.
+        The uniqueness and functional dependency checks only depend on which rows are equal in each column,
+        so if the columns involved in a check have the same fingerprints in two tables, the check gives the
+        same result for both.
+        The codes of the column are renumbered in order of first appearance, so columns with the same pattern
+        of equal values have the same codes, and the fingerprint is a BLAKE2b digest of those codes.
+        Note: Python's hash() is not used, as it has easy collisions (e.g. hash(-1) == hash(-2)).
+
+        Args:
+            col_index (int): The index of the column.
+
+        Returns:
+            Tuple[int, int, bytes]: The row count, unique count and digest of the renumbered codes of the column.
+        """
+        if col_index not in self._fingerprints:
+            first_appearance = {}
+            codes = array(CODE_TYPE, [first_appearance.setdefault(code, len(first_appearance)) \
+                for code in self._store.codes[col_index]])
+            self._fingerprints[col_index] = (self.row_count, len(first_appearance), \
+                hashlib.blake2b(codes.tobytes(), digest_size=32).digest())
+        return self._fingerprints[col_index]
+
+    def _partition(self, combination: Tuple[int, ...]) -> List[Sequence[int]]:
+        """
+        Returns the stripped partition of a combination of column indices, see partitions.py.
+        Partitions are cached, and the partition of a larger combination is calculated from the
+        partitions of two of its subsets instead of scanning the rows again.
+
+        Args:
+            combination (Tuple[int, ...]): A sorted tuple of column indices.
+
+        Returns:
+            List[Sequence[int]]: The stripped partition of the combination.
+        """
+        if combination in self._partition_cache:
+            return self._partition_cache[combination]
+        if len(combination) == 0:
+            # With no columns, every row is in the same class
+            partition = [list(range(self.row_count))] if self.row_count > 1 else []
+        elif len(combination) == 1:
+            partition = partitions.column_partition(self._store.codes[combination[0]])
+        else:
+            # e.g. the partition of (0, 1, 2) is the product of the partitions of (0, 1) and (0, 2)
+            partition = partitions.partition_product(self._partition(combination[:-1]), \
+                self._partition(combination[:-2] + combination[-1:]))
+        self._partition_cache[combination] = partition
+        return partition
+
+    def _evict_partitions(self, size: int) -> None:
+        """
+        Removes the cached partitions of combinations with fewer than size columns.
+
+        Args:
+            size (int): The smallest combination size to keep.
+        """
+        for combination in [comb for comb in self._partition_cache if len(comb) < size]:
+            del self._partition_cache[combination]
+
+    def holds_functional_dependency(self, keyset1: List[str]|Tuple[str, ...], keyset2: List[str]|Tuple[str, ...]) -> bool:
+        """
+        Checks if the functional dependency keyset1 -> keyset2 holds in the table.
+        The dependency holds exactly when keyset1 and the union of both keysets have the same number 
+        of distinct values, which is the case when their stripped partitions have the same error.
+        If those partitions are not cached, the rows are scanned until the first violation instead.
+        Use functional_dependency_violation to find out why a dependency does not hold.
+        Results are kept in the dependency catalogue shared by the projections of the table (see catalogue.py),
+        and are also shared between tables holding the same column data (see resultcache.py).
+        If sample_size is set, the dependency is first checked on the sample rows, and only checked on
+        all rows if it holds in the sample.
+
+        Args:
+            keyset1 (List[str]|Tuple[str, ...]): The determinant column names.
+            keyset2 (List[str]|Tuple[str, ...]): The dependent column names.
+
+        Returns:
+            bool: True if the functional dependency holds, False otherwise.
+        """
+        determinant_set = self.attribute_set(keyset1)
+        determinant = determinant_set.indices()
+        dependent = (self.attribute_set(keyset2) - determinant_set).indices()
+        # A dependency on a subset of the determinant always holds
+        if not dependent:
+            return True
+        # Results are kept for each dependent column in the catalogue shared with related tables (see catalogue.py)
+        catalogue = self.dependency_catalogue
+        catalogue_determinant = catalogue.attribute_mask([self.keys[i] for i in determinant])
+        holds = catalogue.determines(catalogue_determinant, catalogue.attribute_mask([self.keys[i] for i in dependent]))
+        if holds is not None:
+            catalogue.hits += 1
+            return holds
+        for i in dependent:
+            dependent_bit = catalogue.attribute_mask([self.keys[i]])
+            holds = catalogue.lookup(catalogue_determinant, dependent_bit)
+            if holds is None:
+                holds = self._check_cached_functional_dependency(determinant, (i,))
+                catalogue.record(catalogue_determinant, dependent_bit, holds)
+            if not holds:
                 return False
-            seen.add(subset)
         return True
 
+    def _check_cached_functional_dependency(self, determinant: Tuple[int, ...], dependent: Tuple[int, ...]) -> bool:
+        """
+        Checks if the functional dependency determinant -> dependent holds, sharing the result between
+        tables holding the same column data (see resultcache.py).
+        Use holds_functional_dependency instead, which also uses the dependency catalogue.
+
+        Args:
+            determinant (Tuple[int, ...]): The sorted determinant column indices.
+            dependent (Tuple[int, ...]): The sorted dependent column indices, disjoint from the determinant.
+
+        Returns:
+            bool: True if the functional dependency holds, False otherwise.
+        """
+        cache_key = ("fd", tuple(self._column_fingerprint(i) for i in determinant), \
+            tuple(self._column_fingerprint(i) for i in dependent))
+        holds = resultcache.dependency_cache.get(cache_key)
+        if holds is None and self._sample is not None:
+            self.sampling_stats["fd_checks"] += 1
+            if not self._sample._check_functional_dependency(determinant, dependent):
+                self.sampling_stats["fds_rejected_by_sample"] += 1
+                holds = False
+            else:
+                holds = self._check_functional_dependency(determinant, dependent)
+            resultcache.dependency_cache.put(cache_key, holds)
+        elif holds is None:
+            holds = self._check_functional_dependency(determinant, dependent)
+            resultcache.dependency_cache.put(cache_key, holds)
+        return holds
+
+    def _check_functional_dependency(self, determinant: Tuple[int, ...], dependent: Tuple[int, ...]) -> bool:
+        """
+        Checks if the functional dependency determinant -> dependent holds.
+        If the stripped partitions of the determinant and of the union of both are already cached (e.g. by candidate key
+        discovery), their errors are compared. Otherwise the rows are scanned, stopping at the first violation, which is
+        much cheaper than building the partitions as most dependencies tested during the search do not hold.
+        Use holds_functional_dependency instead, which caches the result.
+
+        Args:
+            determinant (Tuple[int, ...]): The sorted determinant column indices.
+            dependent (Tuple[int, ...]): The sorted dependent column indices, disjoint from the determinant.
+
+        Returns:
+            bool: True if the functional dependency holds, False otherwise.
+        """
+        combined = tuple(sorted(determinant + dependent))
+        lhs_partition = self._partition_cache.get(determinant)
+        # A unique determinant trivially determines everything
+        if lhs_partition is not None and not lhs_partition:
+            return True
+        if lhs_partition is None or combined not in self._partition_cache:
+            return self._scan_functional_dependency(determinant, dependent)
+        return partitions.partition_error(lhs_partition) == partitions.partition_error(self._partition_cache[combined])
+
+    def _scan_functional_dependency(self, determinant: Tuple[int, ...], dependent: Tuple[int, ...]) -> bool:
+        """
+        Checks if the functional dependency determinant -> dependent holds by scanning the rows,
+        without building partitions.
+
+        Args:
+            determinant (Tuple[int, ...]): The sorted determinant column indices.
+            dependent (Tuple[int, ...]): The sorted dependent column indices, disjoint from the determinant.
+
+        Returns:
+            bool: True if the functional dependency holds, False otherwise.
+        """
+        return self._find_dependency_violation(determinant, dependent) is None
+
+    def _find_dependency_violation(self, determinant: Tuple[int, ...], dependent: Tuple[int, ...]) -> Optional[Tuple[int, int]]:
+        """
+        Scans the rows for the first pair of rows that agree on the determinant but not on the dependent,
+        stopping as soon as one is found.
+
+        Args:
+            determinant (Tuple[int, ...]): The determinant column indices.
+            dependent (Tuple[int, ...]): The dependent column indices.
+
+        Returns:
+            Optional[Tuple[int, int]]: The indices of the two rows, or None if the functional dependency holds.
+        """
+        store = self._store
+        dependent_of = {}
+        first_row_of = {}
+        for row_index, lhs, rhs in zip(range(store.row_count), store.combination_keys(determinant), \
+            store.combination_keys(dependent)):
+            expected = dependent_of.get(lhs)
+            if expected is None:
+                dependent_of[lhs] = rhs
+                first_row_of[lhs] = row_index
+            elif expected != rhs:
+                return first_row_of[lhs], row_index
+        return None
+
+    def functional_dependency_violation(self, keyset1: List[str]|Tuple[str, ...], \
+        keyset2: List[str]|Tuple[str, ...]) -> Optional[Tuple[int, int, Tuple[Any, ...], Tuple[Any, ...]]]:
+        """
+        Finds a witness that the functional dependency keyset1 -> keyset2 does not hold: the first pair of rows with the
+        same values in keyset1 but different values in keyset2.
+        e.g. (1, 4, ("Alice", "Maths"), ("Alice", "Physics")) for the dependency studentName -> course
+
+        Args:
+            keyset1 (List[str]|Tuple[str, ...]): The determinant column names.
+            keyset2 (List[str]|Tuple[str, ...]): The dependent column names.
+
+        Returns:
+            Optional[Tuple[int, int, Tuple[Any, ...], Tuple[Any, ...]]]: The indices of the two rows (in rows) and their
+            values in keyset1 followed by keyset2, or None if the functional dependency holds.
+        """
+        determinant = tuple(self.keys.index(key) for key in keyset1)
+        dependent = tuple(self.keys.index(key) for key in keyset2)
+        row_pair = self._find_dependency_violation(determinant, dependent)
+        if row_pair is None:
+            return None
+        return self._witness(row_pair, determinant + dependent)
+
+    def _witness(self, row_pair: Tuple[int, int], combination: Tuple[int, ...]) -> Tuple[int, int, Tuple[Any, ...], Tuple[Any, ...]]:
+        """
+        Returns a pair of row indices together with the decoded values of both rows in a combination of columns.
+        """
+        store = self._store
+        values = [tuple(store.dictionaries[i][store.codes[i][row_index]] for i in combination) for row_index in row_pair]
+        return row_pair[0], row_pair[1], values[0], values[1]
+
     def get_valid_primary_key_combinations(self) -> List[Tuple[str, ...]]:
         """
         Returns a list of valid primary key combinations for the table.
@@ -159,39 +936,111 @@ class Table:
         Returns:
             A tuple containing the best combination of primary keys and the corresponding MML value.
         """
-        best_combination = None
-        best_mml = float('inf')
+        ranked_keys = self.rank_candidate_keys()
+        if not ranked_keys:
+            return None, float('inf')
+        return ranked_keys[0]
 
-        for comb in self.candidate_keys:
-            # Calculates the MML value for the current combination
-            mml_value = mml.I(1, self.key_count, [(self.key_count, len(comb))], \
-                [(len(self.rows), self.unique_counts)])
-            # Break MML tiebreaks with the lowest number of attributes in primary key
-            if mml_value < best_mml or (mml_value == best_mml and \
-                (best_combination is None or len(comb) < len(best_combination))):
-                best_mml = mml_value
-                best_combination = comb
+    def rank_candidate_keys(self) -> List[Tuple[Tuple[str, ...], float]]:
+        """
+        Ranks all candidate keys of the table as primary keys using the Minimum Message Length (MML) criterion,
+        best first. Only the number of columns in a key changes its MML value, so each key size is only scored once.
+        MML ties are broken by the lowest number of attributes in the primary key, and then by the order of candidate_keys.
 
-        return best_combination, best_mml
+        Returns:
+            A list of (candidate key, MML value) tuples, from the shortest MML to the longest.
+        """
+        mml_by_key_size = {}
+        for comb in self.candidate_keys:
+            if len(comb) not in mml_by_key_size:
+                mml_by_key_size[len(comb)] = mml.I(1, self.key_count, [(self.key_count, len(comb))], \
+                    [(self.row_count, self.unique_counts)])
+        # sorted is stable, so keys with the same MML value and size stay in their original order
+        return sorted(((comb, mml_by_key_size[len(comb)]) for comb in self.candidate_keys), \
+            key=lambda ranked_key: (ranked_key[1], len(ranked_key[0])))
 
     def calculate_candidate_keys(self) -> List[Tuple[str, ...]]:
         """
         Calculates and returns all possible candidate keys for the table.
 
+        The column combinations are searched level by level (all single columns, then all pairs, etc.).
+        A combination is unique when its stripped partition is empty, and each partition is built from
+        the cached partitions of the previous level. Since any superset of a unique combination is also 
+        unique, only combinations whose subsets are all non-unique are generated for the next level,
+        so a superset of a candidate key is never tested.
+        If key_discovery_workers is more than 1 and the table is large enough, each level is tested in parallel instead.
+        If sample_size is set (and the search is not parallel), each combination is first tested on the sample rows,
+        and only combinations that are unique in the sample are checked on all rows.
+
         Returns:
             A list of tuples representing the candidate keys for the table.
         """
-        valid_combinations = self.get_valid_primary_key_combinations()
-        candidate_keys = []
-        for i in valid_combinations:
-            for j in valid_combinations:
-                # If there is a combination which is a proper subset of the current combination,
-                # then it cannot be a candidate key
-                if set(j).issubset(set(i)) and set(i) != set(j):
-                    break
-            else:
-                candidate_keys.append(i)
-        return candidate_keys
+        # Projections with the same columns as this table have the same candidate keys (see catalogue.py)
+        catalogue = self.dependency_catalogue
+        candidate_key_indices = catalogue.candidate_keys.get(tuple(self.keys))
+        if candidate_key_indices is None:
+            candidate_key_indices = self._discover_candidate_keys()
+            catalogue.candidate_keys[tuple(self.keys)] = candidate_key_indices
+            column_bits = [catalogue.attribute_mask([key]) for key in self.keys]
+            for comb in candidate_key_indices:
+                catalogue.record_key(sum(column_bits[i] for i in comb), sum(column_bits))
+        return [tuple(self.keys[i] for i in comb) for comb in candidate_key_indices]
+
+    def _discover_candidate_keys(self) -> List[Tuple[int, ...]]:
+        """
+        Searches the column combinations of the table for its candidate keys (see calculate_candidate_keys).
+        Combinations whose uniqueness follows from the dependency catalogue are not checked against the rows.
+
+        Returns:
+            List[Tuple[int, ...]]: The candidate keys, as tuples of column indices.
+        """
+        # The candidate keys only depend on the data in the table, so they are shared between tables (see resultcache.py)
+        cache_key = ("candidate_keys", tuple(self._column_fingerprint(i) for i in range(len(self.keys))))
+        candidate_key_indices = resultcache.dependency_cache.get(cache_key)
+        # Starting worker processes costs more than searching small tables, such as most projections made by the search
+        parallel = self.key_discovery_workers > 1 and self.row_count * len(self.keys) >= parallelkeys.MIN_PARALLEL_CELLS
+        if candidate_key_indices is None and parallel:
+            # Each level is split across worker processes instead (see parallelkeys.py)
+            candidate_key_indices = parallelkeys.discover_candidate_keys(self._store, self.key_discovery_workers)
+            resultcache.dependency_cache.put(cache_key, candidate_key_indices)
+        elif candidate_key_indices is None:
+            candidate_key_indices = []
+            sample = self._sample
+            catalogue = self.dependency_catalogue
+            column_bits = [catalogue.attribute_mask([key]) for key in self.keys]
+            level = [(i,) for i in range(len(self.keys))]
+            while level:
+                non_unique_combinations = []
+                for comb in level:
+                    # A combination is unique exactly when it determines every other column
+                    comb_bits = sum(column_bits[i] for i in comb)
+                    is_unique = catalogue.determines(comb_bits, sum(column_bits) & ~comb_bits)
+                    if is_unique is not None:
+                        catalogue.hits += 1
+                    elif sample is None:
+                        is_unique = not self._partition(comb)
+                    else:
+                        self.sampling_stats["key_checks"] += 1
+                        if sample._partition(comb):
+                            self.sampling_stats["keys_rejected_by_sample"] += 1
+                            is_unique = False
+                        else:
+                            # Full partitions are not built for combinations rejected by the sample,
+                            # so the survivors are verified by scanning the rows instead
+                            is_unique = self._is_unique_combination(comb)
+                    if is_unique:
+                        candidate_key_indices.append(comb)
+                    else:
+                        non_unique_combinations.append(comb)
+                level = util.next_lattice_level(non_unique_combinations)
+                # The partitions of the next level are products of partitions of the current one,
+                # so the partitions of older levels are no longer needed
+                if level:
+                    self._evict_partitions(len(level[0]) - 1)
+                    if sample is not None:
+                        sample._evict_partitions(len(level[0]) - 1)
+            resultcache.dependency_cache.put(cache_key, candidate_key_indices)
+        return candidate_key_indices
 
     def calculate_prime_attributes(self) -> List[str]:
         """
@@ -224,8 +1073,7 @@ class Table:
         """
         Returns a new Table object with the same table data but with no primary keys.
         """
-        new_table_data = deepcopy([self.keys]) + deepcopy(self.rows)
-        return Table(new_table_data)
+        return self.project(self.keys, primary_keys=[])
 
     def display_table(self) -> None:
         """
@@ -0,0 +1,98 @@
+import json
+import mmap
+import struct
+import sys
+from array import array
+from columnstore import ColumnStore, CODE_TYPE
+from table import Table
+
+# Binary table file format, which can be opened without parsing the rows again:
+#   - 8 bytes: the magic bytes b"DNATBL01"
+#   - 4 bytes: the length of the metadata in bytes (unsigned, little-endian)
+#   - the metadata as UTF-8 JSON: {"header": [...], "row_count": n, "dictionaries": [[...], ...]}
+#   - zero padding up to a multiple of 8 bytes
+#   - the integer codes of each column, one column after another (4 byte signed, little-endian)
+# The header keeps the asterisk (*) marking primary keys, like the Table constructor.
+
+MAGIC = b"DNATBL01"
+ALIGNMENT = 8
+
+def save_table(table: Table, path: str) -> None:
+    """
+    Writes a table to a binary table file, which can be opened again with open_table.
+    Duplicate rows are removed before writing, as in the table itself.
+
+    Args:
+        table (Table): The table to write.
+        path (str): The path of the file.
+
+    Returns:
+        None
+
+    Raises:
+        ValueError: If a value in the table cannot be stored (only str, int, float, bool and None are supported).
+    """
+    store = table.column_store
+    for dictionary in store.dictionaries:
+        for value in dictionary:
+            if value is not None and not isinstance(value, (str, int, float, bool)):
+                raise ValueError(f"Error: Cannot store value {value!r} of type {type(value).__name__}")
+    metadata = json.dumps({"header": table.header, "row_count": store.row_count, \
+        "dictionaries": store.dictionaries}).encode("utf-8")
+    with open(path, "wb") as file:
+        file.write(MAGIC)
+        file.write(struct.pack("<I", len(metadata)))
+        file.write(metadata)
+        file.write(b"\0" * _padding(len(MAGIC) + 4 + len(metadata)))
+        for codes in store.codes:
+            column = array(CODE_TYPE, codes)
+            if sys.byteorder != "little":
+                column.byteswap()
+            file.write(column.tobytes())
+
+def open_table(path: str) -> Table:
+    """
+    Opens a binary table file written by save_table as a columnar Table.
+    The file is memory-mapped and the code arrays of the table are views of the mapped file, so the
+    rows are neither parsed nor copied; unique counts and dependency checks read the mapped buffers directly.
+    The file stays mapped until table.column_store.close() is called (see ColumnStore.close).
+
+    Args:
+        path (str): The path of the file.
+
+    Returns:
+        Table: The table stored in the file.
+
+    Raises:
+        ValueError: If the file is not a binary table file.
+    """
+    with open(path, "rb") as file:
+        mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    if mapped[:len(MAGIC)] != MAGIC:
+        mapped.close()
+        raise ValueError(f"Error: {path} is not a binary table file")
+    (metadata_length,) = struct.unpack_from("<I", mapped, len(MAGIC))
+    metadata_start = len(MAGIC) + 4
+    metadata = json.loads(mapped[metadata_start:metadata_start + metadata_length].decode("utf-8"))
+    row_count = metadata["row_count"]
+    offset = metadata_start + metadata_length + _padding(metadata_start + metadata_length)
+    column_size = row_count * array(CODE_TYPE).itemsize
+    codes = []
+    for col_index in range(len(metadata["header"])):
+        column = memoryview(mapped)[offset:offset + column_size]
+        if sys.byteorder == "little":
+            codes.append(column.cast(CODE_TYPE))
+        else:
+            # The file is little-endian, so the codes have to be copied and swapped on big-endian machines
+            swapped = array(CODE_TYPE, column.tobytes())
+            swapped.byteswap()
+            codes.append(swapped)
+        offset += column_size
+    store = ColumnStore(codes, metadata["dictionaries"], row_count, mapped_file=mapped)
+    return Table.from_column_store(metadata["header"], store, columnar=True, rows_are_unique=True)
+
+def _padding(length: int) -> int:
+    """
+    Returns the number of padding bytes needed after length bytes to reach the alignment.
+    """
+    return (ALIGNMENT - length % ALIGNMENT) % ALIGNMENT
@@ -24,6 +24,12 @@ print(codetotable.I(3, 10, [(6, 1), (2, 1), (4, 3)], [(5, [5, 5, 5, 5, 2, 2]), (
 # Example for 3NF from paper, returns 210.46 (DA)
 print(codetotable.I(4, 10, [(2, 1), (4, 3), (5, 1), (2, 1)], [(5, [5, 5, 5, 5, 2]), (2, [2, 2]), (4, [4, 4]), (11, [5, 4, 3, 3])]))
 
+############################# TEST I_batch #############################
+# Examples for 1NF, 2NF and 3NF from paper, returns the same values as TEST I
+print(codetotable.I_batch([(10, [(10, 3, 11, [5, 5, 5, 5, 4, 4, 2, 2, 3, 3])]),
+                           (10, [(6, 1, 5, [5, 5, 5, 5, 2, 2]), (2, 1, 4, [4, 4]), (4, 3, 11, [5, 4, 3, 3])]),
+                           (10, [(2, 1, 5, [5, 5, 5, 5, 2]), (4, 3, 2, [2, 2]), (5, 1, 4, [4, 4]), (2, 1, 11, [5, 4, 3, 3])])]))
+
 ############################# TEST I_to_LaTeX #############################
 # Example from paper
 print(codetotable.convert_to_LaTeX(["1NF", "2NF", "3NF"], [[10.22, 203.03, 213.25], [36.45, 154.89, 191.34], [46.26, 153.84, 200.10]]))
\ No newline at end of file
@@ -1,4 +1,10 @@
+import csv
+import os
+import tempfile
 import normalforms
+import loader
+import resultcache
+import tablefile
 from table import Table
 
 # Tables to test
@@ -183,6 +189,139 @@ for t in best_5NF_tables:
     t.display_table()
 print("\nMessage Length of All Table(s) and Data: " + str(normalforms.calculate_mml(best_5NF_tables)))
 
+# Testing the normalise pipeline, which should give the same 5NF tables as the calls above
+pipeline_5NF_tables, report = normalforms.normalise(testingtables, target="5NF")
+print("\n ------- normalise Report -------")
+print("Same Tables as Above: " + str([t.keys for t in pipeline_5NF_tables] == [t.keys for t in best_5NF_tables]))
+for stage in report["stages"]:
+    for table_report in stage["tables"]:
+        print(stage["stage"] + " " + str(table_report))
+
+# Testing the search budget, which stops the searches early and keeps the best tables found so far
+budget = normalforms.SearchBudget(nodes=1)
+budget_5NF_tables = normalforms.create_tables_up_to(testingtables, "5NF", budget=budget)
+print("\n ------- Search Budget of 1 State -------")
+print("Exhaustive: " + str(budget.exhaustive) + ", States Expanded: " + str(budget.nodes_expanded))
+print("MML Value of All Table(s): " + str(normalforms.calculate_mml(budget_5NF_tables)))
+
+# Testing that cached results are not shared between columns with colliding hashes (hash(-1) == hash(-2))
+print("\n ------- Shared Result Cache -------")
+Table([["c", "d", "e"], [-1, 0, 0], [-1, 1, 0], [-2, 1, 1]]).candidate_keys
+collision_table = Table([["c", "d", "e"], [-1, 0, 0], [-2, 1, 0], [-2, 1, 1]])
+print("Candidate Keys Correct: " + str(collision_table.candidate_keys == [("c", "e"), ("d", "e")]))
+print("FD Check Matches Witness: " + str(collision_table.holds_functional_dependency(["c"], ["d"]) == \
+    (collision_table.functional_dependency_violation(["c"], ["d"]) is None)))
+
+# Testing insert_rows and delete_rows, which should give the same table as building it from the new rows
+print("\n ------- Insert and Delete Rows -------")
+def same_table(table, table_data):
+    fresh_table = Table(table_data)
+    return table.rows == fresh_table.rows and table.unique_counts == fresh_table.unique_counts and \
+        table.candidate_keys == fresh_table.candidate_keys and table.prime_attributes == fresh_table.prime_attributes
+updated_table = Table(table_data1)
+updated_table.candidate_keys
+earlier_projection = updated_table.project(["EMPLOYEE_ID", "NAME"])
+earlier_projection_rows = earlier_projection.rows
+inserted_row = [5, "Dana", 3, "Bartender", 26, "Michigan"]
+print("Inserted Rows: " + str(updated_table.insert_rows([inserted_row, inserted_row, table_data1[1]])))
+# The inserted row does not repeat the values of any candidate key, so the keys are kept instead of searched again
+print("Candidate Keys Kept: " + str("candidate_keys" in updated_table.__dict__))
+print("Same as Fresh Table: " + str(same_table(updated_table, table_data1 + [inserted_row])))
+print("Deleted Rows: " + str(updated_table.delete_rows([table_data1[2], table_data1[5], [0, "Nobody", 0, "None", 0, "None"]])))
+remaining_rows = [row for row in table_data1 + [inserted_row] if row not in (table_data1[2], table_data1[5])]
+print("Same as Fresh Table: " + str(same_table(updated_table, remaining_rows)))
+print("Earlier Projection Unchanged: " + str(earlier_projection.rows == earlier_projection_rows))
+
+# Testing renormalise, which should give the same tables as normalising the updated rows from scratch
+print("\n ------- Renormalise -------")
+def headers(tables):
+    return [t.table_data[0] for t in tables]
+renormalise_data = [["A", "B", "C", "D"], [1, "b1", "c1", "d1"], [2, "b1", "c1", "d2"], [3, "b2", "c2", "d1"], [4, "b2", "c2", "d2"]]
+previous_3NF_tables = normalforms.create_tables_up_to([Table(renormalise_data)], "3NF")
+print("Unchanged Rows Reused: " + str(headers(normalforms.renormalise([previous_3NF_tables], [Table(renormalise_data)], "3NF")[0]) \
+    == headers(previous_3NF_tables)))
+# The inserted row breaks the candidate key (B, D), so B -> C becomes a transitive dependency
+inserted_data = renormalise_data + [[5, "b1", "c1", "d1"]]
+print("Broken Candidate Key Searched Again: " + str(headers(normalforms.renormalise([previous_3NF_tables], [Table(inserted_data)], "3NF")[0]) \
+    == headers(normalforms.create_tables_up_to([Table(inserted_data)], "3NF"))))
+# Both input tables have the columns A and B, so the previous tables of each are kept apart
+shared_column_data = [[["A", "B", "C"], [1, "b1", "c1"], [2, "b1", "c2"], [3, "b2", "c1"], [4, "b2", "c2"]], \
+    [["A", "B", "D"], [1, "b1", "d1"], [2, "b1", "d1"], [3, "b2", "d2"], [4, "b2", "d2"], [5, "b3", "d2"]]]
+previous_shared_tables = [normalforms.create_tables_up_to([Table(data)], "3NF") for data in shared_column_data]
+print("Shared Columns Reused: " + str([headers(tables) for tables in normalforms.renormalise(previous_shared_tables, \
+    [Table(data) for data in shared_column_data], "3NF")] == [headers(tables) for tables in previous_shared_tables]))
+
+# Testing IncrementalMML, which should match calculate_mml after every change (up to rounding)
+# The unsplit table has every attribute, so the total number of attributes never changes
+print("\n ------- Incremental MML -------")
+def matches(incremental_mml, tables):
+    return abs(incremental_mml.value() - normalforms.calculate_mml(tables)) <= 0.01
+split_tables = normalforms.create_tables_up_to([Table(inserted_data)], "3NF")
+unsplit_table = normalforms.best_1NF_table(Table(inserted_data))
+incremental_mml = normalforms.IncrementalMML(len(unsplit_table.keys), split_tables)
+print("Initial Matches: " + str(matches(incremental_mml, split_tables)))
+incremental_mml.add(unsplit_table)
+print("Add Matches: " + str(matches(incremental_mml, split_tables + [unsplit_table])))
+incremental_mml.remove(split_tables[0])
+print("Remove Matches: " + str(matches(incremental_mml, split_tables[1:] + [unsplit_table])))
+incremental_mml.swap(unsplit_table, split_tables[0])
+print("Swap Matches: " + str(matches(incremental_mml, split_tables)))
+
+# Testing load_csv, which should give the same table as the Table constructor, with duplicate rows dropped
+print("\n ------- Load CSV -------")
+csv_data = [["studentNo*", "name", "course"], ["10393", "Maverick", "Maths"], ["20392", "Ash", "Physics"], \
+    ["10393", "Maverick", "Maths"], ["12345", "Bobby", "Maths"], ["20392", "Ash", "Physics"]]
+with tempfile.NamedTemporaryFile("w", suffix=".csv", newline="", delete=False) as csv_file:
+    csv.writer(csv_file).writerows(csv_data)
+try:
+    loaded_table = loader.load_csv(csv_file.name)
+finally:
+    os.remove(csv_file.name)
+constructed_table = Table(csv_data)
+print("Same Rows in Same Order: " + str(loaded_table.table_data == constructed_table.table_data))
+print("Same Primary Keys: " + str(loaded_table.primary_keys == constructed_table.primary_keys))
+print("Same Candidate Keys: " + str(loaded_table.candidate_keys == constructed_table.candidate_keys))
+
+# Testing save_table and open_table, which should give back the same table
+print("\n ------- Save and Open Table File -------")
+def round_trip(table):
+    with tempfile.NamedTemporaryFile(suffix=".dnat", delete=False) as table_file:
+        pass
+    try:
+        tablefile.save_table(table, table_file.name)
+        opened_table = tablefile.open_table(table_file.name)
+        same = opened_table.table_data == table.table_data and opened_table.primary_keys == table.primary_keys and \
+            opened_table.candidate_keys == table.candidate_keys
+        opened_table.column_store.close()
+        return same
+    finally:
+        os.remove(table_file.name)
+print("Same Table and Primary Keys: " + str(all(round_trip(t) for t in best_3NF_tables)))
+print("Same Table Without Rows: " + str(round_trip(Table([["studentNo*", "name"]]))))
+try:
+    round_trip(Table([["studentNo", "courses"], [10393, ("Maths", "Physics")]]))
+    print("Tuple Value Rejected: False")
+except ValueError:
+    print("Tuple Value Rejected: True")
+
+# Testing sampling, which should give the same candidate keys and functional dependencies as checking all rows
+# The result cache is cleared so that the sampled table does not reuse the results of the exact table
+print("\n ------- Sampled Dependency Checks -------")
+sampling_data = [["id", "day", "week", "shift"]] + [[i, i % 7, i % 5, (i % 7) * 10] for i in range(200)]
+sampling_pairs = [([a], [b]) for a in sampling_data[0] for b in sampling_data[0] if a != b]
+resultcache.clear()
+exact_table = Table(sampling_data)
+exact_results = (exact_table.candidate_keys, [exact_table.holds_functional_dependency(a, b) for a, b in sampling_pairs])
+resultcache.clear()
+sampled_table = Table(sampling_data)
+# A dependency is checked before sample_size is set, so the sample has to be drawn again
+sampled_table.holds_functional_dependency(["id"], ["day"])
+sampled_table.sample_size = 20
+sampled_results = (sampled_table.candidate_keys, [sampled_table.holds_functional_dependency(a, b) for a, b in sampling_pairs])
+print("Same Keys and Dependencies: " + str(sampled_results == exact_results))
+print("Sample Rejected Keys: " + str(sampled_table.sampling_stats["keys_rejected_by_sample"] > 0))
+print("Sample Rejected Dependencies: " + str(sampled_table.sampling_stats["fds_rejected_by_sample"] > 0))
+
 # --- If you want to debug all found 2NF combinations, uncomment below, comment above 2NF lines
 # and uncomment return all table list line in the 2NF function ---
 
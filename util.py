@@ -68,4 +68,28 @@ def transpose(matrix: List[List[Any]]) -> List[List[Any]]:
         List[List[Any]]: The transposed matrix.
     """
     return list(map(list, zip(*matrix)))
-    
\ No newline at end of file
+    
+def next_lattice_level(level: List[Tuple[int, ...]]) -> List[Tuple[int, ...]]:
+    """
+    Generates the next level of a combination lattice from the current one (apriori-gen).
+    A combination of size k + 1 is only generated if all of its subsets of size k are in the
+    current level, so supersets of anything left out of the current level are never generated.
+
+    Args:
+        level (List[Tuple[int, ...]]): A lexicographically sorted list of combinations of size k.
+
+    Returns:
+        List[Tuple[int, ...]]: A lexicographically sorted list of combinations of size k + 1.
+    """
+    level_set = set(level)
+    next_level = []
+    for i in range(len(level)):
+        for j in range(i + 1, len(level)):
+            # Only combinations sharing the same prefix can be joined, and these are adjacent
+            if level[i][:-1] != level[j][:-1]:
+                break
+            comb = level[i] + level[j][-1:]
+            # The subsets without the last or second last element are level[i] and level[j]
+            if all(comb[:k] + comb[k + 1:] in level_set for k in range(len(comb) - 2)):
+                next_level.append(comb)
+    return next_level